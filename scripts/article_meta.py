@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+記事メタ情報のスキーマ
+構成・タイトル・カテゴリなどを1回のAPI呼び出しでまとめて生成するためのモデルと、
+Structured Outputsで応答させるためのレスポンス形式
+"""
+
+from typing import Dict, List, Type
+from pydantic import BaseModel
+
+class ArticleMeta(BaseModel):
+    """記事のメタ情報（1回のAPI呼び出しでまとめて生成する）"""
+    structure: List[str]
+    title: str
+    categories: List[str]
+    tags: List[str]
+    meta_description: str
+    image_keywords: List[str]
+
+class ArticleReview(BaseModel):
+    """記事のレビュー結果（校正・メタディスクリプション・タイトル案を1回のAPI呼び出しでまとめて生成する）"""
+    suggestions: List[str]
+    meta_description: str
+    titles: List[str]
+
+def response_format_for(model: Type[BaseModel], schema: Dict = None) -> Dict:
+    """
+    Structured Outputs用のレスポンス形式を作成（スキーマに沿ったJSONだけが返される）
+    
+    Args:
+        model: 応答の形を表すモデル
+        schema: モデルから作成したスキーマを調整したもの（省略時はモデルのスキーマをそのまま使う）
+    """
+    schema = schema or model.model_json_schema()
+    schema['additionalProperties'] = False
+    
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': model.__name__,
+            'strict': True,
+            'schema': schema
+        }
+    }
+
+def article_meta_format(categories: List[str]) -> Dict:
+    """
+    記事メタ情報のレスポンス形式を作成
+    
+    Args:
+        categories: 選択可能なカテゴリ（この中の値だけを返させる）
+    """
+    schema = ArticleMeta.model_json_schema()
+    schema['properties']['categories']['items'] = {'type': 'string', 'enum': list(categories)}
+    return response_format_for(ArticleMeta, schema)
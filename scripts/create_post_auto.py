@@ -6,18 +6,18 @@
 
 import os
 import sys
-import json
-import requests
+import asyncio
+import functools
+import tempfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
-import re
+from typing import Any, Callable, List, Dict, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
-import random
-from PIL import Image
-from io import BytesIO
 from colorama import Fore, Back, Style, init
-from image_optimizer import ImageOptimizer
+from openai_batch import BatchDispatcher
+from disk_cache import DiskCache
+from semantic_cache import SemanticCache
 
 # カラー出力の初期化
 init(autoreset=True)
@@ -25,18 +25,245 @@ init(autoreset=True)
 # .envファイルから環境変数を読み込み
 load_dotenv()
 
-# OpenAI クライアントの初期化
-client = OpenAI(
-    api_key=os.environ.get('OPENAI_API_KEY')
-)
+# OpenAI APIキー（起動時に一度だけ読み込む）
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+
+# openai・aiohttp・pydantic・PIL などの重いライブラリは使う直前に読み込む
+# （APIキー未設定時のエラー終了や --help を素早く返すため）
+
+# 並列リクエストでレート制限（429）や一時的なエラーに当たっても、記事全体を失敗させずに
+# SDK組み込みの指数バックオフで再試行する
+OPENAI_MAX_RETRIES = 5
+OPENAI_TIMEOUT = 30.0  # 秒
+
+@functools.lru_cache(maxsize=None)
+def get_openai_client():
+    """OpenAI クライアントを初回利用時に作成（並列にリクエストできる非同期クライアント）"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=OPENAI_MAX_RETRIES, timeout=OPENAI_TIMEOUT)
+
+# OpenAI APIへの同時リクエスト数の上限（利用プランのレート制限に合わせて環境変数で調整）
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('OPENAI_MAX_CONCURRENT_REQUESTS', '10'))
+
+# 使用するモデル（本文は品質重視、出力の短いメタ情報は安価なモデルで生成。環境変数で変更可能）
+CONTENT_MODEL = os.environ.get('OPENAI_CONTENT_MODEL', 'gpt-4o-mini')
+METADATA_MODEL = os.environ.get('OPENAI_METADATA_MODEL', 'gpt-4.1-nano')
+# メタ情報のJSON（構成・タイトル・カテゴリ・タグ・120-155文字のメタディスクリプション・画像キーワード）の出力上限。
+# 途中で切れるとJSONとして読めないため余裕を持たせる（上限は使った分しか課金されない）
+META_MAX_TOKENS = 1200
+
+# OpenAIの応答キャッシュ（同じプロンプトの再実行時はAPIを呼ばない）
+OPENAI_CACHE_PATH = os.path.join('.cache', 'openai.sqlite3')
+OPENAI_CACHE_TTL = 7 * 24 * 60 * 60  # 7日間
+
+# Unsplashの検索結果キャッシュ（同じキーワードの検索でAPIの利用回数を消費しない）
+UNSPLASH_CACHE_PATH = os.path.join('.cache', 'unsplash.sqlite3')
+UNSPLASH_CACHE_TTL = 24 * 60 * 60  # 1日間
+
+# 記事のセマンティックキャッシュ（概要の埋め込みが十分に近ければ生成済みの記事を再利用、--semantic-cacheで有効化）
+SEMANTIC_CACHE_PATH = os.path.join('.cache', 'articles.sqlite3')
+SEMANTIC_CACHE_THRESHOLD = 0.95
+EMBEDDING_MODEL = 'text-embedding-3-small'
+
+# プロンプトキャッシュのルーティングキー（共通の接頭辞を持つリクエストを同じキャッシュに振り分けてもらう）
+PROMPT_CACHE_KEY = 'kevinblog-create-post-auto'
 
 # Unsplash APIの設定
 UNSPLASH_ACCESS_KEY = os.environ.get('UNSPLASH_ACCESS_KEY')
+MIN_IMAGE_WIDTH = 1200  # サムネイル（1200x630）を拡大せずに作れる幅
+
+# HTTPの接続プールとリトライの設定（429・5xx・通信エラーは指数バックオフで再試行）
+HTTP_POOL_SIZE = 16
+# 画像検索は本文生成の前に、ダウンロードは本文生成の後に行うため、その間もアイドル接続を保持する
+HTTP_KEEPALIVE_TIMEOUT = 120
+HTTP_DNS_CACHE_TTL = 600
+HTTP_MAX_CONCURRENT_REQUESTS = 8  # Unsplashへの同時リクエスト数の上限
+HTTP_RETRY_TOTAL = 5
+HTTP_RETRY_BACKOFF = 0.5  # 0.5, 1, 2, 4, 8秒と待ち時間を倍にする
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_CHUNK_SIZE = 64 * 1024  # 画像ダウンロード時に一度に読み込むバイト数
+
+# 記事の最低文字数（下回る場合は追加コンテンツを付け足す）
+MIN_CONTENT_LENGTH = 2000
+# 文字数の見込み（ガイドラインの上限）。見込みが最低文字数＋余裕に届かなければ追加コンテンツを本文と同時に生成
+EXPECTED_INTRO_LENGTH = 150
+EXPECTED_SECTION_LENGTH = 400
+CONTENT_LENGTH_MARGIN = 200
+# 不足が少なくても追加コンテンツはこの文字数以上で依頼する（短すぎる指示では内容のある段落にならない）
+MIN_SHORTFALL_TO_FILL = 200
+# 追加コンテンツの出力トークン数の上限（日本語1文字あたり。指示した文字数を多少超えても途中で切れないよう余裕を持たせる）
+ADDITIONAL_TOKENS_PER_CHAR = 2
+
+def trim_to_last_sentence(text: str) -> str:
+    """途中で切れた文章を、最後に言い切った文（「。」「！」「？」で終わる位置）までに切り詰める"""
+    end = max(text.rfind(mark) for mark in ('。', '！', '？'))
+    return text[:end + 1] if end >= 0 else ''
+
+class SlugTable(dict):
+    """
+    ファイル名（スラッグ）生成用の str.translate 変換表
+    
+    英数字（日本語を含む）・アンダースコア・ハイフンは残し、空白はハイフンに、その他の記号は削除する。
+    Unicode全体を事前に列挙せず、初めて出てきた文字だけをその場で判定して登録する。
+    """
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        if char.isalnum() or char in '_-':
+            value = codepoint
+        elif char.isspace():
+            value = '-'
+        else:
+            value = None
+        self[codepoint] = value
+        return value
+
+SLUG_TABLE = SlugTable()
+
+def make_slug(title: str, max_length: int = 30) -> str:
+    """タイトルからファイル名用のスラッグを生成"""
+    slug = title.translate(SLUG_TABLE)
+    while '--' in slug:
+        slug = slug.replace('--', '-')
+    return slug[:max_length].lower()
+
+# 全タスク共通のシステムプロンプト
+# OpenAIのプロンプトキャッシュ（先頭1024トークン以上が一致すると有効）を効かせるため、
+# 固定の内容はすべてここにまとめ、各リクエストではユーザーメッセージの末尾だけが変わるようにする
+AVAILABLE_CATEGORIES = ['起業', 'AI', 'マーケティング', '経営', 'フリーランス', '資金調達', 'テクノロジー', '働き方']
+
+SYSTEM_PROMPT = f"""あなたはテック系スタートアップを2社創業し、現在3社目を経営している連続起業家です。
+同じような立場の起業家仲間に向けたブログを書いており、記事の構成・タイトル・本文・SEOまで一人で担当しています。
+実体験をベースにした親しみやすいアドバイスを書くのが得意で、失敗談も含めて正直に話し、「一緒に頑張ろう」という温かみのある文体で書きます。
+堅苦しい専門用語は使わず、「実際にやってみてこうだった」という体験談ベースで語りかけるスタイルが特徴です。
+
+## 共通ルール
+• 読者: 同じ立場のテック系起業家・スタートアップ経営者
+• 文体: 親しみやすく親近感のある「です・ます調」（友達に話すような感覚）
+• トーン: 堅苦しくなく、でも役に立つ情報
+• データ: 分かりやすい数字や事例は1-2個程度に留める
+• 専門用語: 最低限に抑え、使う場合は簡単に説明
+• 出力: 指示されたものだけを出力し、前置きや補足説明は書かない
+• JSONでの出力を指示された場合は、各ガイドラインの出力形式よりも指定されたスキーマを優先する
+
+## タスク別ガイドライン
+
+### 記事構成
+• 構成: 4-6個のセクション（読みやすさ重視）
+• 内容: 親しみやすく実践的、「実際にやってみた」体験談ベース
+• 実践性: すぐに試せる簡単なアクション
+• 結論: 「一緒に頑張ろう」的な温かい行動喚起
+• 同じ起業家として「これ、役に立ちそう！」と思える親近感のある構成にする
+• 各セクション名を1行ずつ出力し、番号や記号は付けない
+
+### タイトル
+• 文字数: 25-32文字（読みやすさ重視）
+• 親近感: 具体的な数字は1つ程度、親しみやすい表現
+• 実践性: 「やってみた」「実際に試した」等の体験談ベース
+• 共感: 「あるある」と思える悩みや課題を含める
+• 簡潔性: シンプルで分かりやすい表現
+• 例: 「スタートアップの資金調達、実際にやって分かった3つのコツ」
+• タイトルのみを出力する
+
+### カテゴリとタグ
+• 利用可能なカテゴリ: {', '.join(AVAILABLE_CATEGORIES)}
+• カテゴリ: 上記から1-3個選択
+• タグ: 記事内容に関連する具体的なキーワード5-8個
+• 次の形式で出力する:
+カテゴリ: カテゴリ1, カテゴリ2
+タグ: タグ1, タグ2, タグ3, タグ4, タグ5
+
+### 導入文
+• 読者の悩みに共感し、「あるある」と思える親近感のある導入
+• 経営者目線で「実際にやってみた」感のある実体験ベース
+• 120-150文字程度（読みやすさを重視）
+• 導入文のみを出力し、見出しは付けない
+
+### セクション本文
+• 長さ: 250-400文字（読みやすさ重視、サクッと読める）
+• 必須要素:
+  - 実体験ベースの具体例（「うちの会社では〜」等）
+  - 今すぐ試せる簡単なアクション（2-3項目）
+  - 1つのデータか統計（多すぎず、分かりやすく）
+  - 失敗談や苦労話も交える（親近感アップ）
+• フォーマット: シンプルな箇条書き、読みやすい段落
+• 指定された「セクションの役割」を果たす
+• 見出し（##）は付けず、本文のみを出力する
+
+### メタディスクリプション
+• 120-155文字
+• 記事の価値を明確に伝え、読者がクリックしたくなる魅力的な内容
+• 主要キーワードを含め、検索結果で目立つ表現にする
+• メタディスクリプションのみを出力する
+
+### 画像キーワード
+• Unsplashで検索できる英語キーワード
+• 記事のテーマに関連する視覚的なイメージ
+• プロフェッショナルでビジネス向けの画像
+• 3-5個のキーワードを1行ずつ出力する
+
+### 追加コンテンツ
+• 次のうち最も価値の高いものを1つ選ぶ: よくある質問（FAQ、実際のCEO/CTOからの質問を想定）、実装チェックリスト（段階的に実行できる具体的リスト）、ベンチマーク・KPI設定（成功の測定方法）、失敗回避のポイント（実際の失敗事例から学ぶ注意点）、ROI計算・効果測定（定量的な成果の測り方）
+• 長さ: 200-300文字（サクッと読める）
+• 「うちでもやってみた」的な体験談と、すぐに試せる簡単なアクションを含める
+• 適切な見出し（##）を含める
+• 既存コンテンツと重複しない、即座に実践できる価値ある情報にする
+"""
+
+# セクション名に含まれるキーワードと、そのセクションに割り当てる役割（先にあるものを優先）
+SECTION_ROLE_KEYWORDS = (
+    (("方法", "ステップ", "手順"), "具体的な実行方法を段階的に解説する手順説明的役割"),
+    (("ポイント", "重要"), "重要な要素を整理して読者の理解を深める要点整理的役割"),
+    (("注意", "失敗", "課題"), "リスクや注意点を説明し、読者の失敗を防ぐ警告的役割"),
+    (("事例", "例", "ケース"), "具体的な成功例や実例を紹介し、読者の理解を具体化する事例紹介的役割"),
+)
+
+@functools.lru_cache(maxsize=1024)
+def determine_section_role(section_title: str, section_num: int, total_sections: int) -> str:
+    """セクションの役割を判定（同じ引数の結果はキャッシュ）"""
+    if section_num == 1:
+        return "記事の主題を明確に説明し、読者の理解を深める導入的役割"
+    if section_num == total_sections:
+        return "記事全体をまとめ、読者の次の行動を促す結論的役割"
+    
+    for keywords, role in SECTION_ROLE_KEYWORDS:
+        if any(keyword in section_title for keyword in keywords):
+            return role
+    
+    return "記事の流れに沿って必要な情報を詳しく説明する説明的役割"
 
 class AutoPostCreator:
-    def __init__(self):
+    def __init__(self, batch: Optional[BatchDispatcher] = None, use_cache: bool = True, batch_content: bool = False,
+                 semantic_cache: bool = False):
         self.post_data = {}
-        self.image_optimizer = ImageOptimizer(max_width=1000, quality=85)
+        # 同時実行数の制限はイベントループごとに open_resources() で作成
+        self.request_semaphore: Optional[asyncio.Semaphore] = None
+        # 指定された場合、すべてのChat CompletionsをBatch API経由で実行
+        self.batch = batch
+        # batch_contentの場合は本文（導入文・セクション・追加コンテンツ）だけをBatch APIでまとめて生成
+        self.batch_content = batch_content
+        self.content_batch: Optional[BatchDispatcher] = None
+        self.cache = DiskCache(OPENAI_CACHE_PATH, ttl=OPENAI_CACHE_TTL) if use_cache else None
+        self.unsplash_cache = DiskCache(UNSPLASH_CACHE_PATH, ttl=UNSPLASH_CACHE_TTL) if use_cache else None
+        self.semantic_cache = (
+            SemanticCache(SEMANTIC_CACHE_PATH, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=OPENAI_CACHE_TTL)
+            if semantic_cache else None
+        )
+        # Unsplash用のHTTPセッション（イベントループ内で open_http_session() により作成）
+        self.http: Optional['aiohttp.ClientSession'] = None
+        self.http_semaphore: Optional[asyncio.Semaphore] = None
+        self.background_tasks = set()
+        # キーワードごとの画像検索タスク（キーワード生成中から先行して検索を始める）
+        self.image_searches: Dict[str, asyncio.Task] = {}
+        # 画像のリサイズ・エンコード用プロセスプール（GILを避けて複数コアで処理）
+        self.image_pool: Optional[ProcessPoolExecutor] = None
+        # 作成済みのディレクトリ（画像ごとにmakedirsを呼ばないように記録）
+        self.dirs_made = set()
+    
+    def ensure_dir(self, path: str):
+        """ディレクトリを作成（このインスタンスで作成済みなら何もしない）"""
+        if path not in self.dirs_made:
+            os.makedirs(path, exist_ok=True)
+            self.dirs_made.add(path)
     
     def display_header(self):
         """ヘッダー表示"""
@@ -108,348 +335,254 @@ class AutoPostCreator:
         
         return additional_info
     
-    def generate_complete_article(self, overview: str) -> Dict:
-        """概要から完全な記事を生成"""
-        print(f"\n{Fore.CYAN}🤖 AIが記事を生成中...")
-        
-        # 記事構成の生成
-        print("  📋 記事構成を生成中...")
-        structure = self.generate_article_structure(overview)
+    async def plan_article(self, overview: str) -> tuple:
+        """
+        概要から記事のメタ情報を生成（似た概要で生成済みの記事があればそれを使う）
         
-        # タイトル生成
-        print("  📝 タイトルを生成中...")
-        title = self.generate_title(overview, structure)
-        
-        # カテゴリ・タグ生成
-        print("  🏷️ カテゴリとタグを生成中...")
-        categories, tags = self.generate_categories_and_tags(overview)
-        
-        # 追加情報の収集
-        additional_info = self.get_additional_info(title, overview, structure)
+        Returns:
+            (生成済みの記事またはNone, メタ情報またはNone, 概要の埋め込みベクトル)
+        """
+        print(f"\n{Fore.CYAN}🤖 AIが記事を生成中...")
         
-        # 本文生成
+        # 似た概要で生成済みの記事があれば、埋め込み1回分のコストで再利用
+        overview_embedding = None
+        if self.semantic_cache:
+            overview_embedding = await self._embed(overview)
+            cached = self.semantic_cache.lookup(overview_embedding)
+            if cached is not None:
+                print(f"  ♻️ 似た概要で生成済みの記事を再利用します: {cached['title']}")
+                return cached, None, overview_embedding
+        
+        # 構成・タイトル・カテゴリ・タグ・メタディスクリプション・画像キーワードを1回で生成
+        print("  📋 記事構成・タイトル・カテゴリ・タグを生成中...")
+        meta = await self._generate_meta_bundle(overview)
+        return None, meta, overview_embedding
+    
+    async def generate_complete_article(self, overview: str, meta: 'ArticleMeta', overview_embedding: Optional[List[float]] = None,
+                                        additional_info: Optional[Dict] = None) -> Dict:
+        """メタ情報と追加情報から完全な記事を生成"""
+        additional_info = additional_info or {}
+        title = meta.title
+        structure = meta.structure
+        categories = meta.categories
+        tags = meta.tags
+        meta_description = meta.meta_description
+        image_keywords = meta.image_keywords[:5]  # 最大5個
+        
+        # 本文を生成している間に画像検索を先行して開始
+        if UNSPLASH_ACCESS_KEY:
+            for keyword in image_keywords:
+                self.prefetch_image_search(keyword)
+        
+        # 本文生成（構成から文字数不足が見込まれる場合は追加コンテンツも同時に生成）
         print("  ✍️ 本文を生成中...")
-        content = self.generate_full_content(title, overview, structure, additional_info)
-        
-        # メタディスクリプション生成
-        print("  📋 メタディスクリプションを生成中...")
-        meta_description = self.generate_meta_description(title, content[:500])
-        
-        # 画像キーワード生成
-        print("  🖼️ 画像キーワードを生成中...")
-        image_keywords = self.generate_image_keywords(title, overview)
+        expected_length = EXPECTED_INTRO_LENGTH + EXPECTED_SECTION_LENGTH * len(structure)
+        expected_shortfall = MIN_CONTENT_LENGTH + CONTENT_LENGTH_MARGIN - expected_length
+        if expected_shortfall > 0:
+            content, additional_content = await asyncio.gather(
+                self.generate_full_content(title, overview, structure, additional_info),
+                self.generate_additional_content(title, structure, max(expected_shortfall, MIN_SHORTFALL_TO_FILL))
+            )
+        else:
+            content = await self.generate_full_content(title, overview, structure, additional_info)
+            additional_content = None
         
-        return {
+        article_data = {
             'title': title,
             'structure': structure,
             'content': content,
+            'additional_content': additional_content,
             'categories': categories,
             'tags': tags,
             'meta_description': meta_description,
             'image_keywords': image_keywords
         }
-    
-    def generate_article_structure(self, overview: str) -> List[str]:
-        """記事構成を生成"""
-        prompt = f"""
-以下の概要から、テック系起業家の視点で価値を提供する記事構成を作成してください。
-
-概要: {overview}
-
-要件:
-• 読者: 同じ立場のテック系起業家・スタートアップ経営者
-• 構成: 4-6個のセクション（読みやすさ重視）
-• 内容: 親しみやすく実践的、「実際にやってみた」体験談ベース
-• 実践性: すぐに試せる簡単なアクション
-• データ: 1-2個の分かりやすい数字や事例
-• トーン: 堅苦しくなく、友達にアドバイスするような感覚
-• 結論: 「一緒に頑張ろう」的な温かい行動喚起
-
-同じ起業家として「これ、役に立ちそう！」と思える親近感のある構成にしてください。
-構成の各セクション名を1行ずつ出力してください。番号や記号は不要です。
-"""
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "あなたはテック系スタートアップの経営者で、同じ立場の起業家仲間に向けたブログを書いています。親しみやすく実践的な記事構成を作るのが得意で、「読みやすくて、すぐに役立つ」構成を心がけています。堅苦しい専門用語は使わず、体験談ベースの構成が特徴です。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=300
-        )
+        if self.semantic_cache:
+            self.semantic_cache.add(overview_embedding, article_data)
         
-        content = response.choices[0].message.content.strip()
-        structure = [line.strip() for line in content.split('\n') if line.strip()]
-        return structure
+        return article_data
     
-    def generate_title(self, overview: str, structure: List[str]) -> str:
-        """タイトルを生成"""
-        prompt = f"""
-以下の記事概要と構成から、テック系起業家が思わずクリックしたくなるタイトルを作成してください。
-
-概要: {overview}
-構成: {', '.join(structure)}
-
-要件:
-• 文字数: 25-32文字（読みやすさ重視）
-• ターゲット: 同じ立場のテック系起業家・スタートアップ経営者
-• 親近感: 具体的な数字は1つ程度、親しみやすい表現
-• 実践性: 「やってみた」「実際に試した」等の体験談ベース
-• 共感: 「あるある」と思える悩みや課題を含める
-• 親しみやすさ: 堅苦しくない、友達に教えるような感覚
-• 簡潔性: シンプルで分かりやすい表現
-
-例: 「スタートアップの資金調達、実際にやって分かった3つのコツ」
-
-タイトルのみを出力してください。
-"""
+    async def _embed(self, text: str) -> List[float]:
+        """テキストの埋め込みベクトルを取得"""
+        async with self.request_semaphore:
+            response = await get_openai_client().embeddings.create(model=EMBEDDING_MODEL, input=text)
+        return response.data[0].embedding
+    
+    async def _chat(self, messages: List[Dict], temperature: float, max_tokens: int, model: str = CONTENT_MODEL,
+                    response_format: Optional[Dict] = None, batchable: bool = False,
+                    parse: Optional[Callable[[str], Any]] = None, trim_truncated: bool = False) -> Any:
+        """
+        Chat Completions APIを呼び出して応答テキストを返す（キャッシュ・同時実行数の制限付き）
+        
+        response_formatを指定した場合はStructured Outputs（JSONスキーマ）で応答させる。
+        batchableなリクエストは、本文用のバッチが有効ならBatch APIにまとめて送る。
+        parseを指定した場合は応答をparseで変換して返す（変換に失敗した応答はキャッシュしない）。
+        最後まで生成されなかった応答（finish_reasonが'stop'以外）はキャッシュしない。
+        trim_truncatedの場合、途中で切れた応答は最後に言い切った文までに切り詰める。
+        """
+        params = {
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+        if response_format:
+            params['response_format'] = response_format
+        
+        cache_key = None
+        if self.cache:
+            cache_key = DiskCache.make_key(params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return parse(cached) if parse else cached
+        
+        batch = self.batch or (self.content_batch if batchable else None)
+        if batch:
+            content, finish_reason = await batch.create_with_finish_reason(**params, prompt_cache_key=PROMPT_CACHE_KEY)
+        else:
+            chunks = []
+            finish_reason = None
+            async with self.request_semaphore:
+                stream = await get_openai_client().chat.completions.create(
+                    **params, stream=True, extra_body={'prompt_cache_key': PROMPT_CACHE_KEY}
+                )
+                async for chunk in stream:
+                    if chunk.choices:
+                        chunks.append(chunk.choices[0].delta.content or '')
+                        finish_reason = chunk.choices[0].finish_reason or finish_reason
+            content = ''.join(chunks).strip()
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "あなたはテック系起業家で、同じ立場の仲間に向けたブログを書いています。親しみやすく「読んでみたい！」と思えるタイトル作りが得意です。堅苦しい専門用語は使わず、体験談ベースの親近感のあるタイトルを作るのが特徴です。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.8,
-            max_tokens=100
-        )
+        if trim_truncated and finish_reason != 'stop':
+            content = trim_to_last_sentence(content)
+        
+        # 変換に失敗した応答は例外がそのまま伝わり、キャッシュには残らない
+        result = parse(content) if parse else content
         
-        return response.choices[0].message.content.strip()
+        if self.cache and finish_reason == 'stop':
+            self.cache.set(cache_key, content)
+        
+        return result
     
-    def generate_categories_and_tags(self, overview: str) -> tuple:
-        """カテゴリとタグを生成"""
-        available_categories = ['起業', 'AI', 'マーケティング', '経営', 'フリーランス', '資金調達', 'テクノロジー', '働き方']
+    async def _generate_meta_bundle(self, overview: str) -> 'ArticleMeta':
+        """記事のメタ情報をJSONスキーマに沿って一括生成"""
+        from article_meta import ArticleMeta, article_meta_format
         
-        prompt = f"""
-以下の記事概要に最適なカテゴリとタグを選択・生成してください。
-
-概要: {overview}
+        prompt = f"""【タスク: 記事メタ情報】
+次の概要から、以下の項目をそれぞれガイドラインに従って生成し、指定のJSONスキーマで出力してください。
 
-利用可能なカテゴリ: {', '.join(available_categories)}
+• structure: 「記事構成」のセクション名
+• title: 「タイトル」
+• categories / tags: 「カテゴリとタグ」
+• meta_description: 「メタディスクリプション」
+• image_keywords: 「画像キーワード」
 
-要件:
-• カテゴリ: 上記から1-3個選択
-• タグ: 記事内容に関連する具体的なキーワード5-8個
-
-以下の形式で出力してください:
-カテゴリ: カテゴリ1, カテゴリ2
-タグ: タグ1, タグ2, タグ3, タグ4, タグ5
+概要: {overview}
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await self._chat(
             messages=[
-                {"role": "system", "content": "あなたはコンテンツ分類の専門家です。"},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.3,
-            max_tokens=200
+            temperature=0.7,
+            max_tokens=META_MAX_TOKENS,
+            model=METADATA_MODEL,
+            response_format=article_meta_format(AVAILABLE_CATEGORIES),
+            parse=ArticleMeta.model_validate_json
         )
-        
-        content = response.choices[0].message.content.strip()
-        categories = []
-        tags = []
-        
-        for line in content.split('\n'):
-            if line.startswith('カテゴリ:'):
-                categories = [cat.strip() for cat in line.replace('カテゴリ:', '').split(',') if cat.strip()]
-            elif line.startswith('タグ:'):
-                tags = [tag.strip() for tag in line.replace('タグ:', '').split(',') if tag.strip()]
-        
-        return categories, tags
-    
-    def generate_full_content(self, title: str, overview: str, structure: List[str], additional_info: Dict) -> str:
-        """完全な記事本文を生成（追加情報を活用）"""
-        sections = []
-        
-        # 追加情報を文章に組み込む
-        additional_context = ""
-        if additional_info.get('target_reader'):
-            additional_context += f"具体的読者: {additional_info['target_reader']}\n"
-        if additional_info.get('data_examples'):
-            additional_context += f"含めるべきデータ・事例: {additional_info['data_examples']}\n"
-        if additional_info.get('unique_point'):
-            additional_context += f"差別化ポイント: {additional_info['unique_point']}\n"
+    
+    async def generate_full_content(self, title: str, overview: str, structure: List[str], additional_info: Dict) -> str:
+        """完全な記事本文を生成（導入文と各セクションを並列に生成）"""
+        # 記事全体で共通の文脈を先頭に置き、導入文と各セクションでプロンプトの先頭部分をそろえる
+        article_context = self.build_article_context(title, overview, additional_info)
+        intro_context = ""
         if additional_info.get('avoid_content'):
-            additional_context += f"避けるべき内容: {additional_info['avoid_content']}\n"
+            intro_context += f"避けるべき内容: {additional_info['avoid_content']}\n"
         if additional_info.get('desired_action'):
-            additional_context += f"期待する読者の行動: {additional_info['desired_action']}\n"
+            intro_context += f"期待する読者の行動: {additional_info['desired_action']}\n"
         
         # 導入文を生成
-        intro_prompt = f"""
-「{title}」という記事の導入文を書いてください。
-
-記事概要: {overview}
-
-{additional_context}
-
-要件（テック系起業家向けフレンドリー記事）:
-• 読者の悩みに共感し、「あるある」と思える親近感のある導入
-• 具体的なデータは1-2個程度に留め、親しみやすさを重視
-• 経営者目線で「実際にやってみた」感のある実体験ベース
-• 120-150文字程度（読みやすさを重視）
-• 専門用語は最小限に、使う場合は分かりやすく説明
-• フレンドリーで親しみやすい文体
-
-導入文のみを出力してください。見出しは不要です。
-"""
-        
-        intro_response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "あなたはテック系スタートアップを経営している起業家です。同じ立場の経営者に向けて、親しみやすく実践的なアドバイスを書くのが得意です。堅い専門用語は使わず、「実際にやってみてこうだった」という体験談ベースで語りかけるスタイルが特徴です。"},
-                {"role": "user", "content": intro_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=250
+        intro_prompt = f"""{article_context}
+【タスク: 導入文】
+ガイドラインの「導入文」に従い、この記事の導入文を書いてください。
+{intro_context}"""
+        
+        # 導入文と全セクションを同時にリクエストし、待ち時間を最も遅い1件分に抑える
+        intro, *section_contents = await asyncio.gather(
+            self.generate_intro(intro_prompt),
+            *(
+                self.generate_section_content(title, overview, section_title, i+1, len(structure), additional_info)
+                for i, section_title in enumerate(structure)
+            )
         )
         
-        sections.append(intro_response.choices[0].message.content.strip())
-        
-        # 各セクションの本文を生成
-        for i, section_title in enumerate(structure):
-            section_content = self.generate_section_content(title, overview, section_title, i+1, len(structure), additional_info)
+        sections = [intro]
+        for section_title, section_content in zip(structure, section_contents):
             sections.append(f"## {section_title}\n\n{section_content}")
         
         return "\n\n".join(sections)
     
-    def generate_section_content(self, title: str, overview: str, section_title: str, section_num: int, total_sections: int, additional_info: Dict = None) -> str:
-        """各セクションの内容を生成（追加情報を活用）"""
-        # セクションの役割を判定
-        section_role = self.determine_section_role(section_title, section_num, total_sections)
-        
-        # 追加情報を文脈に組み込む
-        additional_context = ""
+    def build_article_context(self, title: str, overview: str, additional_info: Dict = None) -> str:
+        """記事全体で共通の文脈（導入文・各セクションのプロンプトの先頭に置く部分）を作成"""
+        context = f"記事タイトル: {title}\n記事概要: {overview}\n"
         if additional_info:
             if additional_info.get('data_examples'):
-                additional_context += f"参考にすべきデータ・事例: {additional_info['data_examples']}\n"
+                context += f"参考にすべきデータ・事例: {additional_info['data_examples']}\n"
             if additional_info.get('unique_point'):
-                additional_context += f"強調すべき独自性: {additional_info['unique_point']}\n"
+                context += f"強調すべき独自性: {additional_info['unique_point']}\n"
             if additional_info.get('target_reader'):
-                additional_context += f"具体的読者像: {additional_info['target_reader']}\n"
-            if additional_info.get('desired_action') and section_num == total_sections:
-                additional_context += f"促すべき行動: {additional_info['desired_action']}\n"
-        
-        prompt = f"""
-「{title}」という記事の「{section_title}」セクションを執筆してください。
-
-記事概要: {overview}
-セクション位置: {section_num}/{total_sections}
-セクションの役割: {section_role}
-
-{additional_context}
-
-要件（テック系起業家向けフレンドリー記事）:
-• 読者: 同じ立場のテック系起業家・スタートアップ経営者
-• 文体: 親しみやすく親近感のある「です・ます調」（友達に話すような感覚）
-• 長さ: 250-400文字（読みやすさ重視、サクッと読める）
-• 必須要素:
-  - 実体験ベースの具体例（「うちの会社では〜」等）
-  - 今すぐ試せる簡単なアクション（2-3項目）
-  - 1つのデータか統計（多すぎず、分かりやすく）
-  - 失敗談や苦労話も交える（親近感アップ）
-• フォーマット: シンプルな箇条書き、読みやすい段落
-• トーン: 堅苦しくなく、でも役に立つ情報
-• 専門用語: 最低限に抑え、使う場合は簡単に説明
-
-{section_role}としての役割を果たしつつ、同じ起業家として親しみやすく実践的なアドバイスを書いてください。
-見出し（##）は不要です。本文のみを出力してください。
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "あなたはテック系スタートアップを2社創業し、現在3社目を経営している連続起業家です。同じような立場の起業家仲間に向けて、実体験をベースにした親しみやすいアドバイスを書くのが得意です。失敗談も含めて正直に話し、「一緒に頑張ろう」という温かみのある文体で書きます。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=600
-        )
-        
-        return response.choices[0].message.content.strip()
-    
-    def determine_section_role(self, section_title: str, section_num: int, total_sections: int) -> str:
-        """セクションの役割を判定"""
-        section_title_lower = section_title.lower()
-        
-        if section_num == 1:
-            return "記事の主題を明確に説明し、読者の理解を深める導入的役割"
-        elif section_num == total_sections:
-            return "記事全体をまとめ、読者の次の行動を促す結論的役割"
-        elif "方法" in section_title or "ステップ" in section_title or "手順" in section_title:
-            return "具体的な実行方法を段階的に解説する手順説明的役割"
-        elif "ポイント" in section_title or "重要" in section_title:
-            return "重要な要素を整理して読者の理解を深める要点整理的役割"
-        elif "注意" in section_title or "失敗" in section_title or "課題" in section_title:
-            return "リスクや注意点を説明し、読者の失敗を防ぐ警告的役割"
-        elif "事例" in section_title or "例" in section_title or "ケース" in section_title:
-            return "具体的な成功例や実例を紹介し、読者の理解を具体化する事例紹介的役割"
-        else:
-            return "記事の流れに沿って必要な情報を詳しく説明する説明的役割"
+                context += f"具体的読者像: {additional_info['target_reader']}\n"
+        return context
     
-    def generate_meta_description(self, title: str, content_sample: str) -> str:
-        """メタディスクリプションを生成"""
-        prompt = f"""
-以下の記事のメタディスクリプションを作成してください。
-
-タイトル: {title}
-本文冒頭: {content_sample}
-
-要件:
-• 120-155文字
-• 記事の価値を明確に伝える
-• 読者がクリックしたくなる魅力的な内容
-• 主要キーワードを含める
-• 検索結果で目立つ表現
-
-メタディスクリプションのみを出力してください。
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+    async def generate_intro(self, intro_prompt: str) -> str:
+        """導入文を生成"""
+        return await self._chat(
             messages=[
-                {"role": "system", "content": "あなたはSEOとクリック率最適化の専門家です。"},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": intro_prompt}
             ],
             temperature=0.7,
-            max_tokens=100
+            max_tokens=250,
+            batchable=True
         )
-        
-        return response.choices[0].message.content.strip()
     
-    def generate_image_keywords(self, title: str, overview: str) -> List[str]:
-        """画像検索用のキーワードを生成"""
-        prompt = f"""
-以下の記事に適した画像のキーワードを生成してください。
-
-タイトル: {title}
-概要: {overview}
-
-要件:
-• Unsplashで検索できる英語キーワード
-• 記事のテーマに関連する視覚的なイメージ
-• プロフェッショナルでビジネス向けの画像
-• 3-5個のキーワードセット
+    async def generate_section_content(self, title: str, overview: str, section_title: str, section_num: int, total_sections: int, additional_info: Dict = None) -> str:
+        """各セクションの内容を生成（追加情報を活用）"""
+        # セクションの役割を判定
+        section_role = determine_section_role(section_title, section_num, total_sections)
+        
+        # 記事全体で共通の文脈はセクション固有の内容より前に置き、
+        # 同じ記事の導入文・セクション間でプロンプトの先頭部分（プロンプトキャッシュの対象）をそろえる
+        article_context = self.build_article_context(title, overview, additional_info)
+        section_context = ""
+        if additional_info and additional_info.get('desired_action') and section_num == total_sections:
+            section_context += f"促すべき行動: {additional_info['desired_action']}\n"
+        
+        prompt = f"""{article_context}
+【タスク: セクション本文】
+ガイドラインの「セクション本文」に従い、この記事のセクションを執筆してください。
 
-キーワードのみを1行ずつ出力してください。
-"""
+セクション: {section_title}
+セクション位置: {section_num}/{total_sections}
+セクションの役割: {section_role}
+{section_context}"""
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        content = await self._chat(
             messages=[
-                {"role": "system", "content": "あなたは視覚的コンテンツの専門家です。記事に最適な画像を選ぶのが得意です。"},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=200
+            max_tokens=500,
+            batchable=True
         )
         
-        content = response.choices[0].message.content.strip()
-        keywords = [line.strip() for line in content.split('\n') if line.strip()]
-        return keywords[:5]  # 最大5個
+        # 並列に生成しているセクションは完了した順に進捗を表示
+        print(f"    ✓ セクション{section_num}/{total_sections}: {section_title}（{len(content)}文字）")
+        return content
     
-    def fetch_and_select_images(self, keywords: List[str], article_data: Dict) -> Dict:
+    async def fetch_and_select_images(self, keywords: List[str], article_data: Dict) -> Dict:
         """画像を自動選択"""
         if not UNSPLASH_ACCESS_KEY:
             print(f"{Fore.YELLOW}⚠️ Unsplash APIキーが未設定のため、画像は追加されません。")
@@ -459,9 +592,25 @@ class AutoPostCreator:
         
         print(f"\n{Fore.CYAN}🖼️ 画像を自動選択中...")
         
+        # すべてのキーワードを同時に検索（キーワード生成中に始めた検索があれば再利用）
+        # 重複したキーワードも検索は1回だけにする
+        unique_keywords = list(dict.fromkeys(keywords))
+        results = await asyncio.gather(*(self.prefetch_image_search(keyword) for keyword in unique_keywords))
+        search_results = dict(zip(unique_keywords, results))
+        
+        # 同じ写真がサムネイルと本文、または複数のキーワードで重複しないように、使った写真を記録する
+        used_photos = set()
+        
+        def pick(keyword: str) -> Optional[Dict]:
+            for image in search_results[keyword]:
+                if image['url'] not in used_photos:
+                    used_photos.add(image['url'])
+                    return image
+            return None
+        
         # サムネイル画像の選択
-        for keyword in keywords[:2]:  # 最初の2つのキーワードで試行
-            thumbnail = self.search_best_image(keyword, "landscape")
+        for keyword in unique_keywords[:2]:  # 最初の2つのキーワードで試行
+            thumbnail = pick(keyword)
             if thumbnail:
                 selected_images['thumbnail'] = thumbnail
                 print(f"  ✓ サムネイル画像を選択: {keyword}")
@@ -475,9 +624,9 @@ class AutoPostCreator:
         used_keywords = set()
         
         for i in range(num_content_images):
-            for keyword in keywords:
+            for keyword in unique_keywords:
                 if keyword not in used_keywords:
-                    image = self.search_best_image(keyword, "landscape")
+                    image = pick(keyword)
                     if image:
                         content_images.append({
                             'image': image,
@@ -491,8 +640,50 @@ class AutoPostCreator:
         selected_images['content_images'] = content_images
         return selected_images
     
-    def search_best_image(self, keyword: str, orientation: str = "landscape") -> Optional[Dict]:
-        """最適な画像を検索して選択"""
+    async def _http_get(self, url: str, params: Optional[Dict] = None, as_json: bool = False, dest: Optional[str] = None):
+        """
+        GETリクエストを送り、応答の本文を返す（一時的なエラーは指数バックオフで再試行）
+        
+        destを指定した場合は本文をメモリに溜めずにファイルへ書き出し、そのパスを返す。
+        """
+        import aiohttp
+        
+        for attempt in range(HTTP_RETRY_TOTAL + 1):
+            retry_after = None
+            try:
+                async with self.http_semaphore, self.http.get(url, params=params) as response:
+                    if response.status not in HTTP_RETRY_STATUSES or attempt == HTTP_RETRY_TOTAL:
+                        response.raise_for_status()
+                        if dest:
+                            with open(dest, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(HTTP_CHUNK_SIZE):
+                                    f.write(chunk)
+                            return dest
+                        return await response.json() if as_json else await response.read()
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == HTTP_RETRY_TOTAL:
+                    raise
+            
+            delay = HTTP_RETRY_BACKOFF * (2 ** attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            await asyncio.sleep(delay)
+    
+    def prefetch_image_search(self, keyword: str) -> asyncio.Task:
+        """画像検索をバックグラウンドで開始（同じキーワードは1回だけ検索）"""
+        if keyword not in self.image_searches:
+            self.image_searches[keyword] = asyncio.create_task(self.search_images(keyword, "landscape"))
+        return self.image_searches[keyword]
+    
+    async def search_images(self, keyword: str, orientation: str = "landscape") -> List[Dict]:
+        """画像を検索し、適した順に並べた候補を返す（結果はキーワードと向きごとにキャッシュ）"""
+        cache_key = DiskCache.make_key('search-results', keyword, orientation)
+        if self.unsplash_cache:
+            cached = self.unsplash_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             url = "https://api.unsplash.com/search/photos"
             params = {
@@ -501,84 +692,76 @@ class AutoPostCreator:
                 "orientation": orientation,
                 "order_by": "relevance"
             }
-            headers = {
-                "Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"
-            }
             
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._http_get(url, params=params, as_json=True)
+            
+            # 関連度順を保ちつつ、サムネイルに使っても拡大せずに済む横長の画像を先にする
+            photos = sorted(
+                data.get('results', []),
+                key=lambda photo: not (photo['width'] >= MIN_IMAGE_WIDTH and photo['width'] > photo['height'])
+            )
             
-            if not data.get('results'):
-                return None
+            images = [
+                {
+                    'url': photo['urls']['regular'],
+                    'raw_url': photo['urls']['raw'],
+                    'download_url': photo['links']['download_location'],
+                    'author': photo['user']['name'],
+                    'author_url': photo['user']['links']['html'],
+                    'description': photo.get('description', photo.get('alt_description', '')),
+                    'width': photo['width'],
+                    'height': photo['height']
+                }
+                for photo in photos
+            ]
             
-            # 最も適切な画像を選択（最初の結果を使用）
-            photo = data['results'][0]
+            if self.unsplash_cache:
+                self.unsplash_cache.set(cache_key, images)
             
-            return {
-                'url': photo['urls']['regular'],
-                'download_url': photo['links']['download_location'],
-                'author': photo['user']['name'],
-                'author_url': photo['user']['links']['html'],
-                'description': photo.get('description', photo.get('alt_description', '')),
-                'width': photo['width'],
-                'height': photo['height']
-            }
+            return images
             
         except Exception as e:
             print(f"{Fore.YELLOW}⚠️ 画像検索エラー ({keyword}): {e}")
-            return None
+            return []
     
-    def download_and_optimize_image(self, image_info: Dict, filename_base: str, is_thumbnail: bool = False) -> Optional[str]:
+    async def download_and_optimize_image(self, image_info: Dict, image_filename: str, is_thumbnail: bool = False) -> Optional[str]:
         """画像のダウンロードと最適化"""
+        from image_optimizer import optimize_image_file
+        
         try:
-            # Unsplashのダウンロードトリガー
+            # Unsplashのダウンロードトリガー（応答は待たずに裏で送信）
             if UNSPLASH_ACCESS_KEY and 'download_url' in image_info:
-                requests.get(
-                    image_info['download_url'],
-                    headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
-                )
+                task = asyncio.create_task(self.trigger_unsplash_download(image_info['download_url']))
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
             
-            # 画像をダウンロード
-            response = requests.get(image_info['url'])
-            response.raise_for_status()
-            
-            # PILで画像を開く
-            img = Image.open(BytesIO(response.content))
-            
-            # 画像の最適化
+            # リサイズ・エンコード・保存は別プロセスで実行
+            # エンコードは1回きりだが配信は何度も行われるため、どちらもWeb配信向けに最適化する
+            optimize = True
             if is_thumbnail:
                 # サムネイルは1200x630に最適化（OGP対応）
-                img = self.resize_image_for_thumbnail(img, 1200, 630)
-                quality = 85
+                size, quality = (1200, 630), 85
             else:
                 # 本文画像は最大幅1000pxに制限
-                if img.width > 1000:
-                    ratio = 1000 / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((1000, new_height), Image.Resampling.LANCZOS)
-                quality = 90
+                size, quality = (1000, None), 90
             
-            # 保存
             assets_dir = os.path.join('assets', 'img', 'posts')
-            os.makedirs(assets_dir, exist_ok=True)
+            self.ensure_dir(assets_dir)
             
-            if is_thumbnail:
-                image_filename = f"{filename_base}-thumb.jpg"
-            else:
-                timestamp = datetime.now().strftime('%H%M%S')
-                random_suffix = random.randint(100, 999)
-                image_filename = f"{filename_base}-{timestamp}-{random_suffix}.jpg"
-            
-            image_path = os.path.join(assets_dir, image_filename)
-            
-            # RGB変換（RGBA画像の場合）
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = rgb_img
-            
-            img.save(image_path, 'JPEG', quality=quality, optimize=True)
+            # 画像を一時ファイルにストリーミングでダウンロードし、ワーカーにはパスだけを渡す
+            # （ワーカーが保存先に直接書き込むので、画像データはプロセス間を行き来しない）
+            fd, download_path = tempfile.mkstemp(suffix='.img')
+            os.close(fd)
+            try:
+                await self._http_get(self.sized_image_url(image_info, *size), dest=download_path)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self.image_pool,
+                    functools.partial(optimize_image_file, dest=os.path.join(assets_dir, image_filename)),
+                    download_path, *size, quality, optimize
+                )
+            finally:
+                os.remove(download_path)
             
             return f"/assets/img/posts/{image_filename}"
             
@@ -586,37 +769,36 @@ class AutoPostCreator:
             print(f"{Fore.RED}画像の処理中にエラー: {e}")
             return None
     
-    def resize_image_for_thumbnail(self, img: Image.Image, target_width: int, target_height: int) -> Image.Image:
-        """サムネイル用に画像をリサイズ"""
-        # アスペクト比を計算
-        img_ratio = img.width / img.height
-        target_ratio = target_width / target_height
-        
-        if img_ratio > target_ratio:
-            # 画像が横長すぎる場合
-            new_width = int(target_height * img_ratio)
-            img = img.resize((new_width, target_height), Image.Resampling.LANCZOS)
-            # 中央からクロップ
-            left = (new_width - target_width) // 2
-            img = img.crop((left, 0, left + target_width, target_height))
-        else:
-            # 画像が縦長すぎる場合
-            new_height = int(target_width / img_ratio)
-            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
-            # 中央からクロップ
-            top = (new_height - target_height) // 2
-            img = img.crop((0, top, target_width, top + target_height))
-        
-        return img
+    @staticmethod
+    def sized_image_url(image_info: Dict, width: int, height: Optional[int] = None) -> str:
+        """
+        Unsplashの画像CDN（imgix）に必要なサイズへ縮小させたURLを返す
+        
+        ダウンロード量を減らしつつ、regular（幅1080px）を1200pxのサムネイルへ拡大するのも避ける。
+        """
+        if 'raw_url' not in image_info:
+            return image_info['url']
+        
+        url = f"{image_info['raw_url']}&fm=jpg&q=90&w={width}"
+        if height:
+            url += f"&h={height}&fit=crop"
+        return url
+    
+    async def trigger_unsplash_download(self, download_url: str):
+        """Unsplashの利用規約に従ってダウンロードを通知"""
+        try:
+            await self._http_get(download_url)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️ ダウンロード通知エラー: {e}")
     
-    def save_complete_article(self, article_data: Dict, images: Dict) -> str:
+    async def save_complete_article(self, article_data: Dict, images: Dict) -> str:
         """完成した記事を保存"""
         print(f"\n{Fore.CYAN}💾 記事を保存中...")
         
         # ファイル名の生成
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        filename_base = re.sub(r'[^\w\s-]', '', article_data['title'])
-        filename_base = re.sub(r'[-\s]+', '-', filename_base)[:30].lower()
+        now = datetime.now()
+        date_str = now.strftime('%Y-%m-%d')
+        filename_base = make_slug(article_data['title'])
         filename = f"{date_str}-{filename_base}.md"
         
         # フロントマター
@@ -626,139 +808,128 @@ class AutoPostCreator:
             'categories': article_data['categories'],
             'tags': article_data['tags'],
             'author': 'Kevin',
-            'date': datetime.now().strftime('%Y-%m-%d'),
+            'date': date_str,
             'description': article_data['meta_description']
         }
         
-        # サムネイル画像の処理
+        # サムネイルと本文画像のダウンロード・最適化を同時に実行
+        # 本文画像のファイル名は保存時刻を1回だけ付けた接頭辞＋連番（同じ秒に複数枚あっても重複しない）
+        content_images = images.get('content_images', [])
+        image_prefix = f"{filename_base}-{now.strftime('%H%M%S')}"
         if images.get('thumbnail'):
-            thumbnail_path = self.download_and_optimize_image(
-                images['thumbnail'], 
-                filename_base, 
-                is_thumbnail=True
+            thumbnail_path, content_with_images = await asyncio.gather(
+                self.download_and_optimize_image(images['thumbnail'], f"{filename_base}-thumb.jpg", is_thumbnail=True),
+                self.insert_images_into_content(article_data['content'], content_images, image_prefix)
             )
             if thumbnail_path:
                 frontmatter['image'] = thumbnail_path
                 frontmatter['image_alt'] = images['thumbnail'].get('description', '')
                 frontmatter['image_credit'] = f'Photo by <a href="{images["thumbnail"]["author_url"]}?utm_source=unsplash&utm_medium=referral">{images["thumbnail"]["author"]}</a> on <a href="https://unsplash.com?utm_source=unsplash&utm_medium=referral">Unsplash</a>'
-        
-        # 本文に画像を挿入
-        content_with_images = self.insert_images_into_content(article_data['content'], images.get('content_images', []), filename_base)
+        else:
+            content_with_images = await self.insert_images_into_content(article_data['content'], content_images, image_prefix)
         
         # 文字数チェック
         content_length = len(content_with_images)
         print(f"  📊 記事の文字数: {content_length}文字")
         
-        if content_length < 2000:
-            print(f"  ⚠️ 文字数が少ないため、追加コンテンツを生成中...")
-            additional_content = self.generate_additional_content(article_data)
-            content_with_images += f"\n\n{additional_content}"
-            print(f"  ✓ 追加コンテンツを生成しました（+{len(additional_content)}文字）")
-        
-        # Markdownファイルの作成
-        markdown_content = "---\n"
-        for key, value in frontmatter.items():
-            if isinstance(value, list):
-                markdown_content += f"{key}: {json.dumps(value, ensure_ascii=False)}\n"
-            elif key == 'image_credit':
-                markdown_content += f'{key}: {value}\n'
-            else:
-                markdown_content += f'{key}: "{value}"\n'
-        markdown_content += "---\n\n"
-        markdown_content += content_with_images
-        
-        # ファイル保存
+        additional_content = None
+        shortfall = MIN_CONTENT_LENGTH - content_length
+        if shortfall > 0:
+            # 本文と同時に生成済みであればそれを使い、なければ不足分に見合う長さだけ生成
+            additional_content = article_data.get('additional_content')
+            if not additional_content:
+                print(f"  ⚠️ 文字数が少ないため、追加コンテンツを生成中...")
+                additional_content = await self.generate_additional_content(
+                    article_data['title'], article_data['structure'], max(shortfall, MIN_SHORTFALL_TO_FILL)
+                )
+            if additional_content:
+                print(f"  ✓ 追加コンテンツを生成しました（+{len(additional_content)}文字）")
+        
+        # Markdownファイルの作成（フロントマターはYAMLとしてまとめてシリアライズし、長い値も折り返さない）
+        # libyamlがあればC実装のダンパーを使う
+        import yaml
+        
+        parts = [
+            "---\n",
+            yaml.dump(frontmatter, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper), allow_unicode=True, sort_keys=False,
+                      default_flow_style=None, width=4096),
+            "---\n\n",
+            content_with_images
+        ]
+        if additional_content:
+            parts.extend(("\n\n", additional_content))
+        
+        # ファイル保存（各部分をそのままバッファ付きのファイルに書き込み、本文全体の連結コピーを作らない）
         filepath = os.path.join('_drafts', filename)
-        os.makedirs('_drafts', exist_ok=True)
+        self.ensure_dir('_drafts')
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        with open(filepath, 'wb', buffering=1 << 16) as f:
+            f.writelines(part.encode('utf-8') for part in parts)
         
         print(f"  ✅ 記事を保存しました: {filepath}")
         return filepath
     
-    def insert_images_into_content(self, content: str, content_images: List[Dict], filename_base: str) -> str:
+    async def insert_images_into_content(self, content: str, content_images: List[Dict], image_prefix: str) -> str:
         """コンテンツに画像を挿入"""
         if not content_images:
             return content
         
         sections = content.split('\n\n')
         
-        # 画像を均等に配置
-        num_sections = len([s for s in sections if s.startswith('##')])
+        # 見出しの位置は一度だけ求めておく
+        heading_indices = [i for i, section in enumerate(sections) if section.startswith('##')]
+        num_sections = len(heading_indices)
         if num_sections <= 1:
             return content
         
+        # 画像を均等に配置
         section_interval = max(1, num_sections // len(content_images))
         
-        for i, image_data in enumerate(content_images):
-            # 挿入位置を計算
-            target_section = min(i * section_interval + 1, num_sections - 1)
-            insert_index = self.find_section_end_index(sections, target_section)
-            
-            # 画像をダウンロードして最適化
-            image_path = self.download_and_optimize_image(
-                image_data['image'], 
-                filename_base, 
-                is_thumbnail=False
-            )
-            
+        # 画像をまとめてダウンロードして最適化
+        image_paths = await asyncio.gather(*(
+            self.download_and_optimize_image(image_data['image'], f"{image_prefix}-{i+1:02d}.jpg", is_thumbnail=False)
+            for i, image_data in enumerate(content_images)
+        ))
+        
+        # 見出しのインデックスごとに、その直後に挿入する画像をまとめる
+        insertions: Dict[int, List[str]] = {}
+        for i, (image_data, image_path) in enumerate(zip(content_images, image_paths)):
             if image_path:
+                target_section = min(i * section_interval + 1, num_sections - 1)
                 image_markdown = f"\n![{image_data['image'].get('description', '')}]({image_path})\n"
                 image_markdown += f'*Photo by [{image_data["image"]["author"]}]({image_data["image"]["author_url"]}?utm_source=unsplash&utm_medium=referral) on [Unsplash](https://unsplash.com?utm_source=unsplash&utm_medium=referral)*\n'
                 
-                sections.insert(insert_index + 1, image_markdown)
+                insertions.setdefault(heading_indices[target_section - 1], []).append(image_markdown)
                 print(f"  📷 画像を挿入: {image_data['keyword']}")
         
-        return '\n\n'.join(sections)
-    
-    def find_section_end_index(self, sections: List[str], target_section: int) -> int:
-        """指定されたセクションの終了インデックスを見つける"""
-        section_count = 0
+        # 1回の走査で画像入りのセクション列を組み立てる
+        result = []
         for i, section in enumerate(sections):
-            if section.startswith('##'):
-                section_count += 1
-                if section_count == target_section:
-                    return i
-        return len(sections) - 1
-    
-    def generate_additional_content(self, article_data: Dict) -> str:
-        """追加コンテンツを生成（2000文字に満たない場合）"""
-        prompt = f"""
-「{article_data['title']}」の記事に追加するテック系起業家向け高品質コンテンツを作成してください。
-
-既存の記事構成: {', '.join(article_data['structure'])}
-
-以下のセクションから最も価値の高いものを1つ選んで、詳細な内容を書いてください:
-• よくある質問（FAQ）- 実際のCEO/CTOからの質問を想定
-• 実装チェックリスト - 段階的に実行できる具体的リスト
-• ベンチマーク・KPI設定 - 成功の測定方法
-• 失敗回避のポイント - 実際の失敗事例から学ぶ注意点
-• ROI計算・効果測定 - 定量的な成果の測り方
-
-要件（テック系起業家向けフレンドリー）:
-• 長さ: 200-300文字（サクッと読める）
-• データ: 1つの分かりやすい数字や事例
-• 実践性: すぐに試せる簡単なアクション
-• 親近感: 「うちでもやってみた」的な体験談
-• トーン: 友達にアドバイスするような親しみやすさ
-• 適切な見出し（##）を含める
-• 読みやすく、親しみやすい文体
+            result.append(section)
+            result.extend(insertions.get(i, []))
+        
+        return '\n\n'.join(result)
+    
+    async def generate_additional_content(self, title: str, structure: List[str], shortfall: int = 300) -> str:
+        """追加コンテンツを生成（2000文字に満たない場合、不足する文字数に合わせて長さを調整）"""
+        prompt = f"""【タスク: 追加コンテンツ】
+ガイドラインの「追加コンテンツ」に従い、次の記事に追加するテック系起業家向け高品質コンテンツを作成してください。
 
-既存コンテンツと重複しない、読者にとって即座に実践できる価値ある追加情報を提供してください。
+記事タイトル: {title}
+既存の記事構成: {', '.join(structure)}
+必要な追加文字数: 約{shortfall}文字
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await self._chat(
             messages=[
-                {"role": "system", "content": "あなたはテック系スタートアップを経営している起業家で、同じ立場の仲間に向けて親しみやすいアドバイスをするのが得意です。「実際にやってみてこうだった」という体験談をベースに、読みやすく実践的な追加情報を提供します。堅苦しくなく、友達に教えるような温かみのある文体が特徴です。"},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=400
+            max_tokens=int(shortfall * ADDITIONAL_TOKENS_PER_CHAR),
+            batchable=True,
+            trim_truncated=True
         )
-        
-        return response.choices[0].message.content.strip()
     
     def run(self):
         """メイン実行"""
@@ -768,46 +939,172 @@ class AutoPostCreator:
             # 概要の入力
             overview = self.get_overview()
             
-            # 完全な記事を生成
-            article_data = self.generate_complete_article(overview)
-            
-            # 画像を自動選択
-            images = self.fetch_and_select_images(article_data['image_keywords'], article_data)
-            
-            # 記事を保存
-            filepath = self.save_complete_article(article_data, images)
-            
-            print(f"\n{Fore.GREEN}{'='*60}")
-            print(f"{Fore.GREEN}🎉 全自動記事作成が完了しました！")
-            print(f"{Fore.GREEN}{'='*60}")
-            print(f"\n{Fore.CYAN}📝 生成された記事:")
-            print(f"  📄 タイトル: {article_data['title']}")
-            print(f"  📂 カテゴリ: {', '.join(article_data['categories'])}")
-            print(f"  🏷️ タグ: {', '.join(article_data['tags'])}")
-            print(f"  📊 文字数: {len(article_data['content'])}文字")
-            print(f"  💾 保存先: {filepath}")
+            # 記事のメタ情報を生成
+            plan = asyncio.run(self._with_resources(self.plan_article(overview)))
             
-            if images.get('thumbnail'):
-                print(f"  🖼️ サムネイル: ✓")
-            if images.get('content_images'):
-                print(f"  📷 本文画像: {len(images['content_images'])}枚")
-            
-            print(f"\n{Fore.CYAN}プレビューを表示するには:")
-            print(f"  bundle exec jekyll serve --drafts")
+            # 追加情報の収集（入力待ちの間はイベントループを動かさない。Ctrl+Cがそのまま効き、裏の処理の出力も混ざらない）
+            cached, meta, _ = plan
+            additional_info = self.get_additional_info(meta.title, overview, meta.structure) if cached is None else {}
             
+            # 本文の生成から保存まで
+            article_data, images, filepath = asyncio.run(
+                self._with_resources(self.create_article(overview, plan, additional_info))
+            )
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}⚠️ 作成を中断しました。")
+            return
         except Exception as e:
             print(f"\n{Fore.RED}❌ エラーが発生しました: {e}")
+            return
+        
+        print(f"\n{Fore.GREEN}{'='*60}")
+        print(f"{Fore.GREEN}🎉 全自動記事作成が完了しました！")
+        print(f"{Fore.GREEN}{'='*60}")
+        print(f"\n{Fore.CYAN}📝 生成された記事:")
+        print(f"  📄 タイトル: {article_data['title']}")
+        print(f"  📂 カテゴリ: {', '.join(article_data['categories'])}")
+        print(f"  🏷️ タグ: {', '.join(article_data['tags'])}")
+        print(f"  📊 文字数: {len(article_data['content'])}文字")
+        print(f"  💾 保存先: {filepath}")
+        
+        if images.get('thumbnail'):
+            print(f"  🖼️ サムネイル: ✓")
+        if images.get('content_images'):
+            print(f"  📷 本文画像: {len(images['content_images'])}枚")
+        
+        print(f"\n{Fore.CYAN}プレビューを表示するには:")
+        print(f"  bundle exec jekyll serve --drafts")
+    
+    async def _with_resources(self, coroutine):
+        """HTTPセッションなどを用意して処理を実行し、イベントループを終える前にすべて閉じる"""
+        await self.open_resources()
+        try:
+            return await coroutine
+        finally:
+            await self.close_resources()
+    
+    async def create_article(self, overview: str, plan: Optional[tuple] = None, additional_info: Optional[Dict] = None) -> tuple:
+        """
+        概要から記事を生成し、画像を選んで保存する
+        
+        Args:
+            plan: plan_articleの結果（省略時はここでメタ情報を生成する）
+            additional_info: 追加の質問への回答（省略時は追加情報なしで生成する）
+        """
+        cached, meta, overview_embedding = plan or await self.plan_article(overview)
+        
+        # 完全な記事を生成
+        if cached is not None:
+            article_data = cached
+        else:
+            article_data = await self.generate_complete_article(overview, meta, overview_embedding, additional_info)
+        
+        # 画像を自動選択
+        images = await self.fetch_and_select_images(article_data['image_keywords'], article_data)
+        
+        # 記事を保存
+        filepath = await self.save_complete_article(article_data, images)
+        
+        return article_data, images, filepath
+    
+    async def open_resources(self):
+        """HTTPセッションと画像処理用のプロセスプールを準備（イベントループごとに作成する）"""
+        import aiohttp
+        
+        self.request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.http_semaphore = asyncio.Semaphore(HTTP_MAX_CONCURRENT_REQUESTS)
+        if self.batch_content:
+            self.content_batch = BatchDispatcher(get_openai_client())
+        
+        # 接続はセッション内で再利用し、Unsplashの認証ヘッダーも一度だけ設定する
+        headers = {"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"} if UNSPLASH_ACCESS_KEY else None
+        self.http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                                           ttl_dns_cache=HTTP_DNS_CACHE_TTL),
+            headers=headers
+        )
+        self.image_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    
+    async def close_resources(self):
+        """裏で動いている通知の完了を待ってからHTTPセッションとプロセスプールを閉じる"""
+        if self.background_tasks:
+            await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        if self.http:
+            await self.http.close()
+            self.http = None
+        if self.image_pool:
+            self.image_pool.shutdown()
+            self.image_pool = None
+        self.image_searches.clear()
+        self.content_batch = None
+        # OpenAIクライアントの接続はこのイベントループに結び付いているため、次のループでは作り直す
+        if get_openai_client.cache_info().currsize:
+            await get_openai_client().close()
+            get_openai_client.cache_clear()
+    
+    def run_batch(self, overviews: List[str]):
+        """複数の概要からBatch APIでまとめて記事を生成（非対話）"""
+        self.display_header()
+        print(f"{Fore.CYAN}📦 Batch APIモード: {len(overviews)}件の記事を生成します（完了まで最大24時間）")
+        
+        if not self.batch:
+            self.batch = BatchDispatcher(get_openai_client())
+        
+        try:
+            results = asyncio.run(self._run_batch_async(overviews))
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}⚠️ 作成を中断しました。")
+            return
+        
+        print(f"\n{Fore.GREEN}{'='*60}")
+        print(f"{Fore.GREEN}🎉 バッチ記事作成が完了しました！")
+        print(f"{Fore.GREEN}{'='*60}")
+        for overview, result in zip(overviews, results):
+            if isinstance(result, Exception):
+                print(f"  {Fore.RED}❌ {overview[:30]}: {result}")
+            else:
+                print(f"  💾 {result[2]}")
+    
+    async def _run_batch_async(self, overviews: List[str]) -> list:
+        """全記事の生成処理を並行に進め、各段階のリクエストを1つのバッチにまとめる"""
+        await self.open_resources()
+        try:
+            return await asyncio.gather(
+                *(self.create_article(overview) for overview in overviews),
+                return_exceptions=True
+            )
+        finally:
+            await self.close_resources()
 
 def main():
     """メイン処理"""
-    if not os.environ.get('OPENAI_API_KEY'):
+    parser = argparse.ArgumentParser(description='全自動記事作成ツール')
+    parser.add_argument('--batch', metavar='FILE',
+                        help='1行に1件の概要を書いたファイルから、Batch APIでまとめて記事を生成（非対話・料金約半額）')
+    parser.add_argument('--batch-content', action='store_true',
+                        help='本文（導入文・各セクション）だけをBatch APIでまとめて生成（料金約半額・完了まで時間がかかる）')
+    parser.add_argument('--semantic-cache', action='store_true',
+                        help='似た概要で生成済みの記事があれば、新たに生成せずに再利用する')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='OpenAIの応答とUnsplashの検索結果のキャッシュを使わずに毎回取得する')
+    args = parser.parse_args()
+    
+    if not OPENAI_API_KEY:
         print(f"{Fore.RED}エラー: OPENAI_API_KEY環境変数が設定されていません。")
         sys.exit(1)
     
-    creator = AutoPostCreator()
-    creator.run()
+    creator = AutoPostCreator(use_cache=not args.no_cache, batch_content=args.batch_content,
+                              semantic_cache=args.semantic_cache)
+    
+    if args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            overviews = [line.strip() for line in f if line.strip()]
+        if not overviews:
+            print(f"{Fore.RED}概要が入力されていません: {args.batch}")
+            sys.exit(1)
+        creator.run_batch(overviews)
+    else:
+        creator.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,19 +6,21 @@
 
 import os
 import sys
-import json
-import requests
+import html
+import asyncio
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import re
 from dotenv import load_dotenv
-from openai import OpenAI
-import yaml
-from PIL import Image
-from io import BytesIO
-import inquirer
 from colorama import Fore, Back, Style, init
-from image_optimizer import ImageOptimizer
+from openai_batch import BatchDispatcher
+from disk_cache import DiskCache
+
+# openai・requests・PIL・questionary・yaml・pydantic などの重いライブラリは使う直前に読み込む
+# （APIキー未設定時のエラー終了や --help を素早く返すため）
 
 # カラー出力の初期化
 init(autoreset=True)
@@ -26,16 +28,36 @@ init(autoreset=True)
 # .envファイルから環境変数を読み込み
 load_dotenv()
 
-# OpenAI クライアントの初期化
-client = OpenAI(
-    api_key=os.environ.get('OPENAI_API_KEY')
-)
+# OpenAI APIキー
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+
+# OpenAI APIへの同時リクエスト数の上限（利用プランのレート制限に合わせて環境変数で調整）
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('OPENAI_MAX_CONCURRENT_REQUESTS', '5'))
+# レート制限（429）や一時的なエラーはSDK組み込みの指数バックオフで再試行する
+OPENAI_MAX_RETRIES = 5
+
+# OpenAIの応答キャッシュ（同じプロンプトの再実行時はAPIを呼ばない。全自動記事作成ツールと共用）
+OPENAI_CACHE_PATH = os.path.join('.cache', 'openai.sqlite3')
+OPENAI_CACHE_TTL = 7 * 24 * 60 * 60  # 7日間
+
+# Unsplashの検索結果キャッシュ（選び直しや同じキーワードの再検索でAPIの利用回数を消費しない）
+UNSPLASH_CACHE_PATH = os.path.join('.cache', 'unsplash.sqlite3')
+UNSPLASH_CACHE_TTL = 24 * 60 * 60  # 1日間
 
 # Unsplash APIの設定
 UNSPLASH_ACCESS_KEY = os.environ.get('UNSPLASH_ACCESS_KEY')
 
+# ファイル名（スラッグ）生成用のパターン（記号を削除し、空白とハイフンの連続を1つのハイフンにまとめる）
+SLUG_STRIP_PATTERN = re.compile(r'[^\w\s-]')
+SLUG_DASH_PATTERN = re.compile(r'[-\s]+')
+
+# 画像のダウンロード・最適化を同時に行う数（通信もPillowのエンコードもGILを解放するのでスレッドで並列化できる）
+IMAGE_MAX_WORKERS = 8
+# Unsplashへのリクエストのタイムアウト（秒）。応答がないまま入力待ちの画面が止まらないようにする
+HTTP_TIMEOUT = 30
+
 class InteractivePostCreator:
-    def __init__(self):
+    def __init__(self, batch: bool = False, use_cache: bool = True):
         self.post_data = {
             'title': '',
             'outline': [],
@@ -47,7 +69,126 @@ class InteractivePostCreator:
             'meta_description': ''
         }
         self.templates = self.load_templates()
-        self.image_optimizer = ImageOptimizer(max_width=1000, quality=85)
+        self.client: Optional['AsyncOpenAI'] = None
+        self.request_semaphore: Optional[asyncio.Semaphore] = None
+        # batchの場合はAIへのリクエストをBatch APIでまとめて実行（料金約半額・完了まで時間がかかる）
+        self.batch = batch
+        self.batch_dispatcher: Optional[BatchDispatcher] = None
+        # 同じ内容で生成し直す場合（校正のやり直しなど）はキャッシュした応答を使う
+        self.cache = DiskCache(OPENAI_CACHE_PATH, ttl=OPENAI_CACHE_TTL) if use_cache else None
+        self.unsplash_cache = DiskCache(UNSPLASH_CACHE_PATH, ttl=UNSPLASH_CACHE_TTL) if use_cache else None
+        # 校正・メタディスクリプション・タイトル案をまとめて生成した結果（校正を含むかどうかと組で保持）
+        self._review: Optional[Tuple[bool, 'ArticleReview']] = None
+    
+    @functools.cached_property
+    def image_optimizer(self) -> 'ImageOptimizer':
+        """ローカル画像の最適化に使うオプティマイザ（初回利用時に作成）"""
+        from image_optimizer import ImageOptimizer
+        # 本文画像はWebP版も作り、<picture>で対応ブラウザにはWebPを配信する
+        return ImageOptimizer(max_width=1000, quality=85, webp=True)
+    
+    @functools.cached_property
+    def http(self) -> 'requests.Session':
+        """
+        Unsplashへの接続を使い回すセッション（画像を並列に処理するスレッドの数だけ接続を保持）
+        
+        検索・ダウンロード通知・画像の取得が同じ接続を使うので、TLSのハンドシェイクは最初の1回だけで済む。
+        認証ヘッダーもセッションに一度だけ設定する。
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=IMAGE_MAX_WORKERS, pool_maxsize=IMAGE_MAX_WORKERS))
+        if UNSPLASH_ACCESS_KEY:
+            session.headers['Authorization'] = f"Client-ID {UNSPLASH_ACCESS_KEY}"
+        return session
+    
+    def run_ai(self, *coroutines) -> list:
+        """
+        AIへのリクエストをまとめて並列に実行し、結果を渡した順に返す
+        
+        ユーザーの入力待ちの間はイベントループを動かさない（Ctrl+Cがそのまま効くように）ため、
+        AIを呼ぶ場面ごとにイベントループとクライアントを作成する。
+        """
+        from openai import AsyncOpenAI
+        
+        async def gather():
+            async with AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=OPENAI_MAX_RETRIES) as client:
+                self.client = client
+                self.request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                if self.batch:
+                    self.batch_dispatcher = BatchDispatcher(client)
+                try:
+                    return await asyncio.gather(*coroutines)
+                finally:
+                    self.client = None
+                    self.batch_dispatcher = None
+        
+        return asyncio.run(gather())
+    
+    async def _chat(self, messages: List[Dict], temperature: float, max_tokens: int,
+                    response_format: Optional[Dict] = None, echo: bool = False,
+                    parse: Optional[Callable[[str], Any]] = None) -> Any:
+        """
+        Chat Completions APIを呼び出して応答テキストを返す（キャッシュ・同時実行数の制限付き）
+        
+        response_formatを指定した場合はStructured Outputs（JSONスキーマ）で応答させる。
+        echoの場合は応答をストリーミングで受け取り、生成された順に画面へ表示する。
+        parseを指定した場合は応答をparseで変換して返す（変換に失敗した応答はキャッシュしない）。
+        最後まで生成されなかった応答（finish_reasonが'stop'以外）はキャッシュしない。
+        """
+        params = {
+            'model': "gpt-4o-mini",
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+        if response_format:
+            params['response_format'] = response_format
+        
+        cache_key = None
+        if self.cache:
+            cache_key = DiskCache.make_key(params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if echo:
+                    print(cached)
+                return parse(cached) if parse else cached
+        
+        if self.batch_dispatcher:
+            # 同じ場面で並行して呼ばれたリクエストは1つのバッチにまとめて送信される
+            content, finish_reason = await self.batch_dispatcher.create_with_finish_reason(**params)
+            if echo:
+                print(content)
+        elif echo:
+            # 最初の部分が届いた時点で表示を始め、内容が違えば生成の途中でもCtrl+Cで止められるようにする
+            chunks = []
+            finish_reason = None
+            async with self.request_semaphore:
+                stream = await self.client.chat.completions.create(**params, stream=True)
+                async for chunk in stream:
+                    if chunk.choices:
+                        delta = chunk.choices[0].delta.content or ''
+                        sys.stdout.write(delta)
+                        sys.stdout.flush()
+                        chunks.append(delta)
+                        finish_reason = chunk.choices[0].finish_reason or finish_reason
+            print()
+            content = ''.join(chunks).strip()
+        else:
+            async with self.request_semaphore:
+                response = await self.client.chat.completions.create(**params)
+            content = response.choices[0].message.content.strip()
+            finish_reason = response.choices[0].finish_reason
+        
+        # 変換に失敗した応答は例外がそのまま伝わり、キャッシュには残らない
+        result = parse(content) if parse else content
+        
+        if self.cache and finish_reason == 'stop':
+            self.cache.set(cache_key, content)
+        
+        return result
     
     def load_templates(self) -> Dict:
         """記事構成テンプレートを読み込み"""
@@ -116,6 +257,8 @@ class InteractivePostCreator:
     
     def get_basic_info(self):
         """基本情報の入力"""
+        import questionary
+        
         print(f"{Fore.YELLOW}📌 ステップ1: 基本情報の入力")
         
         # タイトルの入力
@@ -127,13 +270,10 @@ class InteractivePostCreator:
             '起業', 'AI', 'マーケティング', '経営', 
             'フリーランス', '資金調達', 'テクノロジー'
         ]
-        questions = [
-            inquirer.Checkbox('categories',
-                            message='カテゴリを選択してください（複数選択可）',
-                            choices=categories)
-        ]
-        answers = inquirer.prompt(questions)
-        self.post_data['categories'] = answers['categories']
+        self.post_data['categories'] = questionary.checkbox(
+            'カテゴリを選択してください（複数選択可）',
+            choices=categories
+        ).unsafe_ask()
         
         # タグの入力
         print(f"\n{Fore.GREEN}タグを入力してください（カンマ区切り）:")
@@ -142,17 +282,15 @@ class InteractivePostCreator:
     
     def choose_template(self):
         """記事構成テンプレートの選択"""
-        print(f"\n{Fore.YELLOW}📐 ステップ2: 記事構成の選択")
+        import questionary
         
-        choices = [(v['name'], k) for k, v in self.templates.items()]
-        questions = [
-            inquirer.List('template',
-                         message='記事の構成テンプレートを選択してください',
-                         choices=choices)
-        ]
-        answers = inquirer.prompt(questions)
+        print(f"\n{Fore.YELLOW}📐 ステップ2: 記事構成の選択")
         
-        template_key = answers['template']
+        choices = [questionary.Choice(v['name'], value=k) for k, v in self.templates.items()]
+        template_key = questionary.select(
+            '記事の構成テンプレートを選択してください',
+            choices=choices
+        ).unsafe_ask()
         
         if template_key == 'custom':
             # カスタム構成の作成
@@ -212,6 +350,8 @@ class InteractivePostCreator:
         print(f"\n{Fore.YELLOW}✍️  ステップ3: コンテンツの作成")
         
         content_sections = []
+        # バッチモードでは、AIに任せるセクションの入力をすべて受け付けてからまとめて生成する
+        ai_requests: Dict[int, Tuple[str, str]] = {}
         
         for i, section in enumerate(self.post_data['outline'], 1):
             print(f"\n{Fore.CYAN}セクション {i}/{len(self.post_data['outline'])}: {section}")
@@ -224,33 +364,14 @@ class InteractivePostCreator:
                 print(f"{Fore.GREEN}どのような内容を書きたいか、キーワードや要点を入力してください:")
                 prompt_input = input("> ").strip()
                 
-                ai_content = self.generate_section_content(section, prompt_input)
-                print(f"\n{Fore.CYAN}AIが生成した内容:")
-                print(ai_content)
+                if self.batch:
+                    ai_requests[len(content_sections)] = (section, prompt_input)
+                    content_sections.append(None)
+                    continue
                 
-                if input(f"\n{Fore.GREEN}この内容を使用しますか？ (y/n/edit): ").lower() == 'edit':
-                    print("内容を編集してください（Ctrl+Dで終了）:")
-                    edited_content = []
-                    try:
-                        while True:
-                            line = input()
-                            edited_content.append(line)
-                    except EOFError:
-                        pass
-                    content_sections.append(f"## {section}\n\n" + '\n'.join(edited_content))
-                elif input().lower() == 'y':
-                    content_sections.append(f"## {section}\n\n" + ai_content)
-                else:
-                    # 手動で入力
-                    print("内容を入力してください（Ctrl+Dで終了）:")
-                    manual_content = []
-                    try:
-                        while True:
-                            line = input()
-                            manual_content.append(line)
-                    except EOFError:
-                        pass
-                    content_sections.append(f"## {section}\n\n" + '\n'.join(manual_content))
+                print(f"\n{Fore.CYAN}AIが生成した内容:")
+                ai_content, = self.run_ai(self.generate_section_content(section, prompt_input, echo=True))
+                content_sections.append(self.review_ai_section(section, ai_content, show=False))
             else:
                 # 手動入力された内容を使用
                 print("続きを入力してください（Ctrl+Dで終了）:")
@@ -263,9 +384,48 @@ class InteractivePostCreator:
                     pass
                 content_sections.append(f"## {section}\n\n" + '\n'.join(manual_content))
         
+        if ai_requests:
+            print(f"\n{Fore.CYAN}AIに任せた{len(ai_requests)}件のセクションをBatch APIでまとめて生成しています（完了まで時間がかかります）...")
+            ai_contents = self.run_ai(*(
+                self.generate_section_content(section, keywords) for section, keywords in ai_requests.values()
+            ))
+            for (index, (section, _)), ai_content in zip(ai_requests.items(), ai_contents):
+                print(f"\n{Fore.CYAN}セクション {index+1}/{len(self.post_data['outline'])}: {section}")
+                content_sections[index] = self.review_ai_section(section, ai_content)
+        
         self.post_data['content'] = '\n\n'.join(content_sections)
     
-    def generate_section_content(self, section: str, keywords: str) -> str:
+    def review_ai_section(self, section: str, ai_content: str, show: bool = True) -> str:
+        """AIが生成したセクションを表示し、使用・編集・手動入力のいずれかで確定する（生成中に表示済みならshow=False）"""
+        if show:
+            print(f"\n{Fore.CYAN}AIが生成した内容:")
+            print(ai_content)
+        
+        if input(f"\n{Fore.GREEN}この内容を使用しますか？ (y/n/edit): ").lower() == 'edit':
+            print("内容を編集してください（Ctrl+Dで終了）:")
+            edited_content = []
+            try:
+                while True:
+                    line = input()
+                    edited_content.append(line)
+            except EOFError:
+                pass
+            return f"## {section}\n\n" + '\n'.join(edited_content)
+        elif input().lower() == 'y':
+            return f"## {section}\n\n" + ai_content
+        else:
+            # 手動で入力
+            print("内容を入力してください（Ctrl+Dで終了）:")
+            manual_content = []
+            try:
+                while True:
+                    line = input()
+                    manual_content.append(line)
+            except EOFError:
+                pass
+            return f"## {section}\n\n" + '\n'.join(manual_content)
+    
+    async def generate_section_content(self, section: str, keywords: str, echo: bool = False) -> str:
         """AIによるセクションコンテンツ生成"""
         prompt = f"""
 「{self.post_data['title']}」という記事の「{section}」セクションを書いてください。
@@ -282,42 +442,37 @@ class InteractivePostCreator:
 - 読者が今すぐ実行できるアクション
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await self._chat(
             messages=[
                 {"role": "system", "content": "あなたはビジネスブログの執筆をサポートするライターです。読者に価値を提供する充実した内容を書きます。"},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=800
+            max_tokens=800,
+            echo=echo
         )
-        
-        return response.choices[0].message.content.strip()
     
     def add_images(self):
         """画像の追加"""
+        import questionary
+        
         print(f"\n{Fore.YELLOW}🖼️  ステップ4: 画像の追加")
         
         # 画像追加方法の選択
         print(f"\n{Fore.GREEN}画像の追加方法を選択してください:")
         choices = [
-            ('Unsplashから検索', 'unsplash'),
-            ('ローカルファイルから選択', 'local'),
-            ('スキップ', 'skip')
-        ]
-        questions = [
-            inquirer.List('method',
-                         message='画像の追加方法',
-                         choices=choices)
+            questionary.Choice('Unsplashから検索', value='unsplash'),
+            questionary.Choice('ローカルファイルから選択', value='local'),
+            questionary.Choice('スキップ', value='skip')
         ]
-        answer = inquirer.prompt(questions)
+        method = questionary.select('画像の追加方法', choices=choices).unsafe_ask()
         
-        if answer['method'] == 'skip':
+        if method == 'skip':
             return
         
         # サムネイル画像の設定
         print(f"\n{Fore.CYAN}サムネイル画像の設定")
-        if answer['method'] == 'unsplash':
+        if method == 'unsplash':
             print(f"{Fore.GREEN}検索キーワードを入力してください:")
             thumbnail_query = input("> ").strip()
             if thumbnail_query:
@@ -338,7 +493,7 @@ class InteractivePostCreator:
         # 本文内画像の追加
         if input(f"\n{Fore.GREEN}本文内に画像を追加しますか？ (y/n): ").lower() == 'y':
             while True:
-                if answer['method'] == 'unsplash':
+                if method == 'unsplash':
                     print(f"\n{Fore.GREEN}画像の検索キーワードを入力してください（空行で終了）:")
                     query = input("> ").strip()
                     
@@ -376,6 +531,8 @@ class InteractivePostCreator:
     
     def search_and_select_image(self, query: str, is_thumbnail: bool = False) -> Optional[Dict]:
         """Unsplash画像の検索と選択"""
+        import questionary
+        
         if not UNSPLASH_ACCESS_KEY:
             print(f"{Fore.RED}Unsplash APIキーが設定されていません。")
             return None
@@ -389,13 +546,14 @@ class InteractivePostCreator:
                 "per_page": 5,
                 "orientation": "landscape"
             }
-            headers = {
-                "Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"
-            }
-            
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            cache_key = DiskCache.make_key('interactive-search', params)
+            data = self.unsplash_cache.get(cache_key) if self.unsplash_cache else None
+            if data is None:
+                response = self.http.get(url, params=params, timeout=HTTP_TIMEOUT)
+                response.raise_for_status()
+                data = response.json()
+                if self.unsplash_cache and data.get('results'):
+                    self.unsplash_cache.set(cache_key, data)
             
             if not data.get('results'):
                 print(f"{Fore.RED}画像が見つかりませんでした。")
@@ -407,24 +565,20 @@ class InteractivePostCreator:
             for i, photo in enumerate(data['results'], 1):
                 description = photo.get('description') or photo.get('alt_description', '説明なし')
                 choice_text = f"{i}. {description[:50]}... (by {photo['user']['name']})"
-                choices.append((choice_text, i-1))
-            choices.append(("キャンセル", -1))
+                choices.append(questionary.Choice(choice_text, value=i-1))
+            choices.append(questionary.Choice("キャンセル", value=-1))
             
-            questions = [
-                inquirer.List('selection',
-                             message='使用する画像を選択してください',
-                             choices=choices)
-            ]
-            answer = inquirer.prompt(questions)
+            selection = questionary.select('使用する画像を選択してください', choices=choices).unsafe_ask()
             
-            if answer['selection'] == -1:
+            if selection == -1:
                 return None
             
-            selected_photo = data['results'][answer['selection']]
+            selected_photo = data['results'][selection]
             
             # 画像情報を整理
             image_info = {
                 'url': selected_photo['urls']['regular'],
+                'raw_url': selected_photo['urls']['raw'],
                 'download_url': selected_photo['links']['download_location'],
                 'author': selected_photo['user']['name'],
                 'author_url': selected_photo['user']['links']['html'],
@@ -448,19 +602,22 @@ class InteractivePostCreator:
         """レビューと最適化"""
         print(f"\n{Fore.YELLOW}🔍 ステップ5: レビューと最適化")
         
+        proofreading = input(f"\n{Fore.GREEN}AI文章校正を実行しますか？ (y/n): ").lower() == 'y'
+        
+        # 校正・メタディスクリプション・タイトル案は同じ本文から作るので、1回のリクエストでまとめて生成する
+        print(f"{Fore.CYAN}文章を分析し、メタディスクリプションとタイトルの最適化提案を生成しています...")
+        review = self.run_ai(self._combined_review(proofreading))[0]
+        title_suggestions = review.titles[:3]
+        
         # AI文章校正
-        if input(f"\n{Fore.GREEN}AI文章校正を実行しますか？ (y/n): ").lower() == 'y':
-            print(f"{Fore.CYAN}文章を分析中...")
-            suggestions = self.ai_proofreading()
-            
-            if suggestions:
-                print(f"\n{Fore.CYAN}改善提案:")
-                for i, suggestion in enumerate(suggestions, 1):
-                    print(f"{i}. {suggestion}")
-        
-        # SEOメタディスクリプション生成
-        print(f"\n{Fore.GREEN}メタディスクリプションを生成します...")
-        self.post_data['meta_description'] = self.generate_meta_description()
+        suggestions = review.suggestions[:5] if proofreading else []
+        if suggestions:
+            print(f"\n{Fore.CYAN}改善提案:")
+            for i, suggestion in enumerate(suggestions, 1):
+                print(f"{i}. {suggestion}")
+        
+        # SEOメタディスクリプション
+        self.post_data['meta_description'] = review.meta_description
         print(f"{Fore.CYAN}生成されたメタディスクリプション:")
         print(self.post_data['meta_description'])
         
@@ -469,9 +626,6 @@ class InteractivePostCreator:
             self.post_data['meta_description'] = custom_desc
         
         # タイトルの最適化提案
-        print(f"\n{Fore.GREEN}タイトルの最適化提案を生成しています...")
-        title_suggestions = self.suggest_optimized_titles()
-        
         print(f"\n{Fore.CYAN}タイトル最適化提案:")
         print(f"現在のタイトル: {self.post_data['title']}")
         for i, title in enumerate(title_suggestions, 1):
@@ -481,110 +635,77 @@ class InteractivePostCreator:
         if choice.isdigit() and 1 <= int(choice) <= len(title_suggestions):
             self.post_data['title'] = title_suggestions[int(choice)-1]
     
-    def ai_proofreading(self) -> List[str]:
-        """AI文章校正"""
-        prompt = f"""
-以下の記事を校正し、改善提案をしてください：
-
-タイトル: {self.post_data['title']}
-
-本文:
-{self.post_data['content'][:2000]}...
-
-以下の観点で分析してください：
+    async def _combined_review(self, proofreading: bool = True) -> 'ArticleReview':
+        """
+        校正・メタディスクリプション・タイトル案を1回のAPI呼び出しでまとめて生成
+        
+        Args:
+            proofreading: 校正の改善提案も生成するか（Falseの場合suggestionsは空）
+        """
+        from article_meta import ArticleReview, response_format_for
+        
+        # 生成済みの結果で足りる場合はリクエストしない
+        if self._review and (self._review[0] or not proofreading):
+            return self._review[1]
+        
+        proofreading_request = """
+■ suggestions（文章校正）
+以下の観点で分析し、改善提案を5個以内で1つずつ入れてください：
 1. 文章の読みやすさ
 2. 論理的な流れ
 3. 専門用語の適切な使用
 4. 誤字脱字
 5. SEOの観点
-
-改善提案を5個以内でリスト形式で出力してください。
+""" if proofreading else """
+■ suggestions
+空のリストにしてください。
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "あなたはプロの編集者です。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
-        
-        content = response.choices[0].message.content.strip()
-        # 改善提案をリスト化
-        suggestions = [line.strip() for line in content.split('\n') if line.strip() and (line.strip()[0].isdigit() or line.strip().startswith('-'))]
-        return suggestions[:5]
-    
-    def generate_meta_description(self) -> str:
-        """メタディスクリプション生成"""
         prompt = f"""
-以下の記事のメタディスクリプションを作成してください：
+以下の記事をレビューし、指定された項目を作成してください：
 
 タイトル: {self.post_data['title']}
 カテゴリ: {', '.join(self.post_data['categories'])}
-本文冒頭: {self.post_data['content'][:500]}
 
-要件：
+本文:
+{self.post_data['content'][:2000]}...
+{proofreading_request}
+■ meta_description（メタディスクリプション）
 - 120-155文字
 - 記事の内容を的確に要約
 - 読者がクリックしたくなる内容
 - 主要キーワードを含める
 
-メタディスクリプションのみを出力してください。
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "あなたはSEOスペシャリストです。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=100
-        )
-        
-        return response.choices[0].message.content.strip()
-    
-    def suggest_optimized_titles(self) -> List[str]:
-        """最適化されたタイトル候補を提案"""
-        prompt = f"""
-現在のタイトル「{self.post_data['title']}」をSEO最適化してください。
-
-記事の内容：
-{self.post_data['content'][:500]}
-
-要件：
+■ titles（現在のタイトルのSEO最適化案）
 - 25-35文字
 - 検索されやすいキーワードを含む
 - クリック率を高める要素（数字、メリット、感情的訴求）を含む
-- 3つの改善案を提示
-
-改善案のみを1行ずつ出力してください。
+- 3つの改善案を1つずつ入れる
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        review = await self._chat(
             messages=[
-                {"role": "system", "content": "あなたはSEOとコピーライティングの専門家です。"},
+                {"role": "system", "content": "あなたはSEOとコピーライティングに精通したプロの編集者です。"},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.8,
-            max_tokens=200
+            temperature=0.7,
+            max_tokens=800,
+            response_format=response_format_for(ArticleReview),
+            parse=ArticleReview.model_validate_json
         )
-        
-        content = response.choices[0].message.content.strip()
-        titles = [line.strip() for line in content.split('\n') if line.strip()]
-        return titles[:3]
+        self._review = (proofreading, review)
+        return review
     
     def save_post(self):
         """記事の保存"""
         print(f"\n{Fore.YELLOW}💾 ステップ6: 記事の保存")
         
         # ファイル名の生成
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        filename_base = re.sub(r'[^\w\s-]', '', self.post_data['title'])
-        filename_base = re.sub(r'[-\s]+', '-', filename_base)[:30].lower()
+        # 保存時刻は1回だけ取得し、ファイル名・フロントマター・画像名で共有する
+        now = datetime.now()
+        date_str = now.strftime('%Y-%m-%d')
+        filename_base = SLUG_STRIP_PATTERN.sub('', self.post_data['title'])
+        filename_base = SLUG_DASH_PATTERN.sub('-', filename_base)[:30].lower()
         filename = f"{date_str}-{filename_base}.md"
         
         # フロントマター
@@ -594,39 +715,28 @@ class InteractivePostCreator:
             'categories': self.post_data['categories'],
             'tags': self.post_data['tags'],
             'author': 'Kevin',
-            'date': datetime.now().strftime('%Y-%m-%d'),
+            'date': date_str,
             'description': self.post_data['meta_description']
         }
         
-        # サムネイル画像の処理
-        if self.post_data['thumbnail']:
-            if self.post_data['thumbnail'].get('type') == 'local':
-                # ローカル画像の最適化
-                try:
-                    _, info = self.image_optimizer.optimize_image(
-                        self.post_data['thumbnail']['path'],
-                        f"{filename_base}-thumb.jpg",
-                        is_thumbnail=True
-                    )
-                    frontmatter['image'] = info['optimized_path']
-                    frontmatter['image_alt'] = self.post_data['thumbnail'].get('alt', '')
-                    print(f"{Fore.GREEN}サムネイル画像を最適化しました（圧縮率: {info['compression_ratio']}%）")
-                except Exception as e:
-                    print(f"{Fore.RED}サムネイル画像の最適化に失敗: {e}")
-            else:
-                # Unsplash画像のダウンロード
-                thumbnail_path = self.download_and_optimize_image(
-                    self.post_data['thumbnail'], 
-                    filename_base, 
-                    is_thumbnail=True
-                )
-                if thumbnail_path:
-                    frontmatter['image'] = thumbnail_path
-                    frontmatter['image_alt'] = self.post_data['thumbnail'].get('alt', '')
-                    frontmatter['image_credit'] = f'Photo by <a href="{self.post_data["thumbnail"]["author_url"]}?utm_source=unsplash&utm_medium=referral">{self.post_data["thumbnail"]["author"]}</a> on <a href="https://unsplash.com?utm_source=unsplash&utm_medium=referral">Unsplash</a>'
+        # サムネイルと本文画像のダウンロード・最適化をスレッドプールで同時に実行
+        # 本文画像のファイル名は保存時刻を1回だけ付けた接頭辞＋連番（同じ秒に複数枚あっても重複しない）
+        sorted_images = sorted(self.post_data['images'], key=lambda x: x.get('position', 999))
+        image_prefix = f"{filename_base}-{now.strftime('%H%M%S')}"
+        with ThreadPoolExecutor(max_workers=IMAGE_MAX_WORKERS) as executor:
+            thumbnail_future = None
+            if self.post_data['thumbnail']:
+                thumbnail_future = executor.submit(self._materialize_thumbnail, self.post_data['thumbnail'], filename_base)
+            image_markdowns = list(executor.map(
+                self._materialize_image,
+                sorted_images,
+                [f"{image_prefix}-{i:02d}" for i in range(len(sorted_images))]
+            ))
+            if thumbnail_future:
+                frontmatter.update(thumbnail_future.result())
         
         # コンテンツに画像を挿入
-        content_with_images = self.insert_images_into_content()
+        content_with_images = self.insert_images_into_content(sorted_images, image_markdowns)
         
         # 文字数チェック
         content_length = len(content_with_images)
@@ -634,28 +744,28 @@ class InteractivePostCreator:
             print(f"\n{Fore.YELLOW}⚠️  現在の文字数: {content_length}文字（推奨: 2000文字以上）")
             if input(f"{Fore.GREEN}文字数を増やすために追加セクションを作成しますか？ (y/n): ").lower() == 'y':
                 self.add_additional_sections()
-                content_with_images = self.insert_images_into_content()
+                content_with_images = self.insert_images_into_content(sorted_images, image_markdowns)
         else:
             print(f"\n{Fore.GREEN}✓ 文字数: {content_length}文字")
         
-        # Markdownファイルの作成
-        markdown_content = "---\n"
-        for key, value in frontmatter.items():
-            if isinstance(value, list):
-                markdown_content += f"{key}: {json.dumps(value, ensure_ascii=False)}\n"
-            elif key == 'image_credit':
-                markdown_content += f'{key}: {value}\n'
-            else:
-                markdown_content += f'{key}: "{value}"\n'
-        markdown_content += "---\n\n"
-        markdown_content += content_with_images
+        # Markdownファイルの作成（フロントマターはYAMLとしてまとめてシリアライズし、長い値も折り返さない）
+        # libyamlがあればC実装のダンパーを使う
+        import yaml
+        
+        parts = [
+            "---\n",
+            yaml.dump(frontmatter, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper), allow_unicode=True, sort_keys=False,
+                      default_flow_style=None, width=4096),
+            "---\n\n",
+            content_with_images
+        ]
         
-        # ファイル保存
+        # ファイル保存（各部分をそのままバッファ付きのファイルに書き込み、本文全体の連結コピーを作らない）
         filepath = os.path.join('_drafts', filename)
         os.makedirs('_drafts', exist_ok=True)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        with open(filepath, 'wb', buffering=1 << 16) as f:
+            f.writelines(part.encode('utf-8') for part in parts)
         
         print(f"\n{Fore.GREEN}✅ 記事が保存されました: {filepath}")
         
@@ -663,22 +773,108 @@ class InteractivePostCreator:
         print(f"\n{Fore.CYAN}プレビューを表示するには以下のコマンドを実行してください:")
         print(f"bundle exec jekyll serve --drafts")
     
-    def download_and_optimize_image(self, image_info: Dict, filename_base: str, is_thumbnail: bool = False) -> Optional[str]:
-        """画像のダウンロードと最適化"""
+    def _materialize_thumbnail(self, thumbnail: Dict, filename_base: str) -> Dict:
+        """サムネイル画像を最適化して保存し、フロントマターに加える項目を返す（スレッドプールから呼び出す）"""
+        if thumbnail.get('type') == 'local':
+            # ローカル画像の最適化
+            try:
+                _, info = self.image_optimizer.optimize_image(
+                    thumbnail['path'],
+                    f"{filename_base}-thumb.jpg",
+                    is_thumbnail=True
+                )
+                print(f"{Fore.GREEN}サムネイル画像を最適化しました（圧縮率: {info['compression_ratio']}%）")
+                return {
+                    'image': info['optimized_path'],
+                    'image_alt': thumbnail.get('alt', '')
+                }
+            except Exception as e:
+                print(f"{Fore.RED}サムネイル画像の最適化に失敗: {e}")
+                return {}
+        
+        # Unsplash画像のダウンロード
+        thumbnail_path = self.download_and_optimize_image(thumbnail, f"{filename_base}-thumb", is_thumbnail=True)
+        if not thumbnail_path:
+            return {}
+        return {
+            'image': thumbnail_path,
+            'image_alt': thumbnail.get('alt', ''),
+            'image_credit': f'Photo by <a href="{thumbnail["author_url"]}?utm_source=unsplash&utm_medium=referral">{thumbnail["author"]}</a> on <a href="https://unsplash.com?utm_source=unsplash&utm_medium=referral">Unsplash</a>'
+        }
+    
+    def _materialize_image(self, image: Dict, filename_stem: str) -> Optional[str]:
+        """本文画像を最適化して保存し、挿入するMarkdownを返す（失敗した場合はNone、スレッドプールから呼び出す）"""
+        if image.get('type') == 'local':
+            # ローカル画像の最適化
+            try:
+                _, info = self.image_optimizer.optimize_image(
+                    image['path'],
+                    f"{filename_stem}.jpg",
+                    is_thumbnail=False
+                )
+                print(f"{Fore.GREEN}画像を最適化しました（圧縮率: {info['compression_ratio']}%）")
+                if 'webp_path' in info:
+                    return (f'\n<picture>\n'
+                            f'  <source srcset="{info["webp_path"]}" type="image/webp">\n'
+                            f'  <img src="{info["optimized_path"]}" alt="{html.escape(image.get("alt", ""))}">\n'
+                            f'</picture>\n')
+                return f"\n![{image.get('alt', '')}]({info['optimized_path']})\n"
+            except Exception as e:
+                print(f"{Fore.RED}画像の最適化に失敗: {e}")
+                return None
+        
+        # Unsplash画像のダウンロード
+        image_path = self.download_and_optimize_image(image, filename_stem, is_thumbnail=False)
+        if not image_path:
+            return None
+        image_markdown = f"\n![{image.get('description', '')}]({image_path})\n"
+        image_markdown += f'*Photo by [{image["author"]}]({image["author_url"]}?utm_source=unsplash&utm_medium=referral) on [Unsplash](https://unsplash.com?utm_source=unsplash&utm_medium=referral)*\n'
+        return image_markdown
+    
+    def download_and_optimize_image(self, image_info: Dict, filename_stem: str, is_thumbnail: bool = False) -> Optional[str]:
+        """
+        画像のダウンロードと最適化
+        
+        本文画像はWebP（同じ画質のJPEGより2-3割小さい）、サムネイルはOGPで確実に表示できるJPEGで保存する。
+        拡張子は保存した形式に合わせて付ける。
+        """
+        from io import BytesIO
+        from PIL import Image
+        from image_optimizer import LANCZOS, flatten_to_rgb
+        
         try:
             # Unsplashのダウンロードトリガー
             if UNSPLASH_ACCESS_KEY and 'download_url' in image_info:
-                requests.get(
-                    image_info['download_url'],
-                    headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
-                )
+                self.http.get(image_info['download_url'], timeout=HTTP_TIMEOUT)
             
-            # 画像をダウンロード
-            response = requests.get(image_info['url'])
-            response.raise_for_status()
+            # 画像をダウンロード（PILで開いた時点ではヘッダーだけを読み、サイズと形式が分かる）
+            # 本文画像はUnsplashの画像CDN（imgix）に最大幅のWebPへ変換させ、手元での再エンコードを省く
+            url = image_info['url']
+            if not is_thumbnail and 'raw_url' in image_info:
+                url = f"{image_info['raw_url']}&fm=webp&q=82&w=1200"
+            # BytesIOは書き込まない限りbytesをコピーせずに共有するので、ダウンロードしたデータは1つだけ保持される
+            data = BytesIO(self.fetch_bytes(url))
+            img = Image.open(data)
             
-            # PILで画像を開く
-            img = Image.open(BytesIO(response.content))
+            assets_dir = os.path.join('assets', 'img', 'posts')
+            os.makedirs(assets_dir, exist_ok=True)
+            
+            # 本文画像がすでに最大幅に収まるRGBのJPEG・WebP（Unsplashのregularは幅1080px）なら、
+            # デコード・リサイズ・再エンコードをせずにダウンロードしたデータをそのまま保存する
+            if not is_thumbnail and img.format in ('JPEG', 'WEBP') and img.mode == 'RGB' and img.width <= 1200:
+                image_filename = f"{filename_stem}.{'webp' if img.format == 'WEBP' else 'jpg'}"
+                with open(os.path.join(assets_dir, image_filename), 'wb') as f:
+                    f.write(data.getvalue())
+                return f"/assets/img/posts/{image_filename}"
+            
+            # JPEGは必要なサイズを下回らない範囲で縮小しながらデコードする（1/2, 1/4, 1/8）
+            if is_thumbnail:
+                img.draft('RGB', (1200, 630))
+            else:
+                img.draft('RGB', (1200, max(1, img.height * 1200 // img.width)))
+            img.load()
+            # デコード後は圧縮データが不要なので、リサイズ・エンコードの前に解放する
+            data.close()
             
             # 画像の最適化
             if is_thumbnail:
@@ -686,32 +882,21 @@ class InteractivePostCreator:
                 img = self.resize_image(img, 1200, 630)
                 quality = 85
             else:
-                # 本文画像は最大幅1200pxに制限
-                if img.width > 1200:
-                    ratio = 1200 / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((1200, new_height), Image.Resampling.LANCZOS)
-                quality = 90
-            
-            # 保存
-            assets_dir = os.path.join('assets', 'img', 'posts')
-            os.makedirs(assets_dir, exist_ok=True)
-            
-            if is_thumbnail:
-                image_filename = f"{filename_base}-thumb.jpg"
-            else:
-                timestamp = datetime.now().strftime('%H%M%S')
-                image_filename = f"{filename_base}-{timestamp}.jpg"
-            
-            image_path = os.path.join(assets_dir, image_filename)
+                # 本文画像は最大幅1200pxに制限（その場で縮小し、小さい画像は拡大しない）
+                img.thumbnail((1200, 10**9), LANCZOS)
+                quality = 82
             
             # RGB変換（RGBA画像の場合）
             if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = rgb_img
+                img = flatten_to_rgb(img)
             
-            img.save(image_path, 'JPEG', quality=quality, optimize=True)
+            if is_thumbnail:
+                image_filename = f"{filename_stem}.jpg"
+                img.save(os.path.join(assets_dir, image_filename), 'JPEG', quality=quality, optimize=True)
+            else:
+                # method=4は圧縮率とエンコード速度のバランスが良い（6は1-2%小さくなるがかなり遅い）
+                image_filename = f"{filename_stem}.webp"
+                img.save(os.path.join(assets_dir, image_filename), 'WEBP', quality=quality, method=4)
             
             return f"/assets/img/posts/{image_filename}"
             
@@ -719,28 +904,18 @@ class InteractivePostCreator:
             print(f"{Fore.RED}画像の処理中にエラーが発生しました: {e}")
             return None
     
-    def resize_image(self, img: Image.Image, target_width: int, target_height: int) -> Image.Image:
+    def fetch_bytes(self, url: str) -> bytes:
+        """URLの内容をダウンロード（レスポンスは返却時に破棄され、本文のbytesだけが残る）"""
+        with self.http.get(url, timeout=HTTP_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            return response.content
+    
+    def resize_image(self, img: 'Image.Image', target_width: int, target_height: int) -> 'Image.Image':
         """画像を指定サイズにリサイズ（アスペクト比を維持してクロップ）"""
-        # アスペクト比を計算
-        img_ratio = img.width / img.height
-        target_ratio = target_width / target_height
-        
-        if img_ratio > target_ratio:
-            # 画像が横長すぎる場合
-            new_width = int(target_height * img_ratio)
-            img = img.resize((new_width, target_height), Image.Resampling.LANCZOS)
-            # 中央からクロップ
-            left = (new_width - target_width) // 2
-            img = img.crop((left, 0, left + target_width, target_height))
-        else:
-            # 画像が縦長すぎる場合
-            new_height = int(target_width / img_ratio)
-            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
-            # 中央からクロップ
-            top = (new_height - target_height) // 2
-            img = img.crop((0, top, target_width, top + target_height))
-        
-        return img
+        from image_optimizer import resize_to_fill
+        
+        # 中央クロップとリサイズを1回の処理で行い、切り捨てる部分は縮小しない
+        return resize_to_fill(img, target_width, target_height)
     
     def add_additional_sections(self):
         """追加セクションの作成"""
@@ -779,9 +954,8 @@ class InteractivePostCreator:
             if user_input.lower() == 'ai':
                 print(f"{Fore.GREEN}このセクションで書きたい内容のキーワードを入力してください:")
                 prompt_input = input("> ").strip()
-                ai_content = self.generate_section_content(section_name, prompt_input)
                 print(f"\n{Fore.CYAN}AIが生成した内容:")
-                print(ai_content)
+                ai_content, = self.run_ai(self.generate_section_content(section_name, prompt_input, echo=True))
                 
                 if input(f"\n{Fore.GREEN}この内容を使用しますか？ (y/n): ").lower() == 'y':
                     self.post_data['content'] += f"\n\n## {section_name}\n\n{ai_content}"
@@ -807,51 +981,33 @@ class InteractivePostCreator:
                     pass
                 self.post_data['content'] += f"\n\n## {section_name}\n\n" + '\n'.join(manual_content)
     
-    def insert_images_into_content(self) -> str:
-        """コンテンツに画像を挿入"""
+    def insert_images_into_content(self, sorted_images: List[Dict], image_markdowns: List[Optional[str]]) -> str:
+        """コンテンツに画像を挿入（画像は保存済みのものを使い、追加セクション後の再挿入でも処理し直さない）"""
         content = self.post_data['content']
         sections = content.split('\n\n')
         
-        # 画像を位置順にソート
-        sorted_images = sorted(self.post_data['images'], key=lambda x: x.get('position', 999))
+        # 見出しの位置を一度だけ求め、「N番目のセクションの後」を次の見出しの直前として扱う
+        # （セクション内の段落数によらず、指定したセクションの末尾に入る）
+        heading_indices = [i for i, section in enumerate(sections) if section.startswith('## ')]
         
-        # 各画像を適切な位置に挿入
-        for i, image in enumerate(sorted_images):
-            position = image.get('position', 0)
-            # セクションの位置を計算（アウトラインに基づく）
-            insert_index = min(position * 2 + 2 + i, len(sections))
+        # 挿入先の段落の位置ごとに、その直前に入れる画像をまとめる
+        insertions: Dict[int, List[str]] = {}
+        for image, image_markdown in zip(sorted_images, image_markdowns):
+            if not image_markdown:
+                continue
             
-            if image.get('type') == 'local':
-                # ローカル画像の最適化
-                try:
-                    timestamp = datetime.now().strftime('%H%M%S')
-                    title_clean = re.sub(r'[^\w\s-]', '', self.post_data['title'])[:30].lower()
-                    filename = f"{title_clean}-{timestamp}-{i:02d}.jpg"
-                    _, info = self.image_optimizer.optimize_image(
-                        image['path'],
-                        filename,
-                        is_thumbnail=False
-                    )
-                    image_markdown = f"\n![{image.get('alt', '')}]({info['optimized_path']})\n"
-                    print(f"{Fore.GREEN}画像を最適化しました（圧縮率: {info['compression_ratio']}%）")
-                except Exception as e:
-                    print(f"{Fore.RED}画像の最適化に失敗: {e}")
-                    continue
-            else:
-                # Unsplash画像のダウンロード
-                title_clean = re.sub(r'[^\w\s-]', '', self.post_data['title'])[:30].lower()
-                image_path = self.download_and_optimize_image(image, 
-                                                             title_clean,
-                                                             is_thumbnail=False)
-                if image_path:
-                    image_markdown = f"\n![{image.get('description', '')}]({image_path})\n"
-                    image_markdown += f'*Photo by [{image["author"]}]({image["author_url"]}?utm_source=unsplash&utm_medium=referral) on [Unsplash](https://unsplash.com?utm_source=unsplash&utm_medium=referral)*\n'
-                else:
-                    continue
-            
-            sections.insert(insert_index, image_markdown)
+            next_heading = image.get('position', 0) + 1
+            insert_index = heading_indices[next_heading] if next_heading < len(heading_indices) else len(sections)
+            insertions.setdefault(insert_index, []).append(image_markdown)
         
-        return '\n\n'.join(sections)
+        # 1回の走査で画像入りのセクション列を組み立てる
+        result = []
+        for i, section in enumerate(sections):
+            result.extend(insertions.get(i, []))
+            result.append(section)
+        result.extend(insertions.get(len(sections), []))
+        
+        return '\n\n'.join(result)
     
     def run(self):
         """メイン実行"""
@@ -874,14 +1030,24 @@ class InteractivePostCreator:
                 self.save_post()
         except Exception as e:
             print(f"\n{Fore.RED}❌ エラーが発生しました: {e}")
+        finally:
+            if 'http' in self.__dict__:
+                self.http.close()
 
 def main():
     """メイン処理"""
-    if not os.environ.get('OPENAI_API_KEY'):
+    parser = argparse.ArgumentParser(description='インタラクティブ記事作成支援ツール')
+    parser.add_argument('--batch', action='store_true',
+                        help='AIへのリクエストをBatch APIでまとめて実行（料金約半額・完了まで時間がかかる）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='OpenAIの応答とUnsplashの検索結果のキャッシュを使わずに毎回取得する')
+    args = parser.parse_args()
+    
+    if not OPENAI_API_KEY:
         print(f"{Fore.RED}エラー: OPENAI_API_KEY環境変数が設定されていません。")
         sys.exit(1)
     
-    creator = InteractivePostCreator()
+    creator = InteractivePostCreator(batch=args.batch, use_cache=not args.no_cache)
     creator.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+ディスクキャッシュユーティリティ
+APIの応答などをSQLiteに保存し、同じリクエストの再実行を省略する
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Any, Optional
+
+# orjson（C実装）があれば値のシリアライズに使う（保存形式はどちらも同じJSONなので混在しても読める）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(value: Any) -> str:
+    if orjson:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False)
+
+def _loads(value: str) -> Any:
+    if orjson:
+        return orjson.loads(value)
+    return json.loads(value)
+
+class DiskCache:
+    def __init__(self, path: str, ttl: Optional[int] = None):
+        """
+        SQLiteを使ったキー・バリュー型のキャッシュ
+        
+        Args:
+            path: SQLiteファイルのパス
+            ttl: 有効期限（秒）。Noneの場合は無期限
+        """
+        self.path = path
+        self.ttl = ttl
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self.purge_expired()
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """JSON化できる値からキャッシュキー（SHA-256）を生成"""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """キャッシュされた値を取得（存在しない・期限切れの場合はNone）"""
+        row = self.conn.execute(
+            "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        
+        if row is None:
+            return None
+        
+        value, created_at = row
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            return None
+        
+        return _loads(value)
+    
+    def set(self, key: str, value: Any):
+        """値をキャッシュに保存"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+            (key, _dumps(value), time.time())
+        )
+        self.conn.commit()
+    
+    def purge_expired(self):
+        """期限切れのエントリを削除（キャッシュファイルが増え続けないように）"""
+        if self.ttl is None:
+            return
+        self.conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl,))
+        self.conn.commit()
@@ -3,25 +3,57 @@ import os
 import sys
 import json
 import random
+import asyncio
+import argparse
 from datetime import datetime
-import openai
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
 import re
+import aiohttp
 from dotenv import load_dotenv
-from openai import OpenAI
-import requests
+from openai import AsyncOpenAI
+
+from disk_cache import DiskCache
 
 # .envファイルから環境変数を読み込み
 load_dotenv()
 
-# OpenAI クライアントの初期化
-client = OpenAI(
-    api_key=os.environ.get('OPENAI_API_KEY')
+# 並列リクエストでレート制限（429）や一時的なエラーに当たっても、記事全体を失敗させずに
+# SDK組み込みの指数バックオフで再試行する
+OPENAI_MAX_RETRIES = 5
+
+# OpenAI クライアントの初期化（記事ごとの処理を並行して進められる非同期クライアント）
+client = AsyncOpenAI(
+    api_key=os.environ.get('OPENAI_API_KEY'),
+    max_retries=OPENAI_MAX_RETRIES
 )
 
+# OpenAI APIへの同時リクエスト数の上限（利用プランのレート制限に合わせて環境変数で調整）
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('OPENAI_MAX_CONCURRENT_REQUESTS', '8'))
+request_semaphore: Optional[asyncio.Semaphore] = None
+
 # Unsplash APIの設定
 UNSPLASH_ACCESS_KEY = os.environ.get('UNSPLASH_ACCESS_KEY')
 
+# プロンプトキャッシュのルーティングキー（共通の接頭辞を持つリクエストを同じキャッシュに振り分けてもらう）
+PROMPT_CACHE_KEY = 'kevinblog-generate-post'
+
+# ファイル名に使う英単語の抽出パターン
+ASCII_WORD_PATTERN = re.compile(r'[a-zA-Z]+')
+
+# HTTPの接続プールとリトライの設定（Unsplashの検索・ダウンロードトリガー・画像取得で接続を再利用する）
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUT = 30
+HTTP_RETRY_TOTAL = 3
+HTTP_RETRY_BACKOFF = 0.2  # 0.2, 0.4, 0.8秒と待ち時間を倍にする
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_CHUNK_SIZE = 64 * 1024  # 画像ダウンロード時に一度に読み込むバイト数
+
+# OpenAIの応答キャッシュ（途中で失敗して同じ日に再実行した場合などに、生成済みの記事を使い回す）
+# 毎日新しい記事を作るのが目的なので、有効期限は1日にする
+OPENAI_CACHE_PATH = os.path.join('.cache', 'generate_post.sqlite3')
+OPENAI_CACHE_TTL = 24 * 60 * 60  # 1日間
+llm_cache: Optional[DiskCache] = None
+
 # 記事のトピックとカテゴリ
 TOPICS = [
     {
@@ -51,62 +83,71 @@ TOPICS = [
     }
 ]
 
-def generate_article_title(theme: str) -> str:
-    """SEOに最適化された記事タイトルを生成"""
-    prompt = f"""
-{theme}について、SEOに最適化されたビジネスブログの記事タイトルを作ってください。
-
-読者は起業家やフリーランスの方々です。
-彼らが「これは読みたい！」と思うような、実践的で役立ちそうなタイトルにしてください。
-
-SEO要件：
-- 20-35文字（理想は28文字前後）
-- 主要キーワード「{theme}」を含める
-- 数字や具体的なメリットを含める（例：5つの方法、3ステップ、2倍の成果）
-- 「〜の方法」「〜のコツ」「完全ガイド」「成功法則」など実践的な表現を使う
-- 検索者の意図に合致する言葉を使う
+# 複数記事をまとめて生成する場合の1記事あたりの出力トークン数（gpt-4o-miniの出力上限を超えないようにする）
+ARTICLE_TOKEN_BUDGET = 3000
+MAX_OUTPUT_TOKENS = 16000
 
-タイトルだけを出力してください。
+async def chat(messages: List[Dict], temperature: float, max_tokens: int, response_format: Optional[Dict] = None,
+               parse: Optional[Callable[[str], Any]] = None) -> Any:
     """
+    Chat Completions APIを呼び出して応答テキストを返す（同じリクエストはキャッシュした応答を使う）
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "あなたはSEOとコンバージョン最適化に精通したビジネスブログの編集者です。検索順位とクリック率を最大化するタイトルを作成します。"},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.8,
-        max_tokens=100
-    )
+    parseを指定した場合は応答をparseで変換して返す（変換に失敗した応答はキャッシュしない）。
+    """
+    params = {
+        'model': "gpt-4o-mini",
+        'messages': messages,
+        'temperature': temperature,
+        'max_tokens': max_tokens
+    }
+    if response_format:
+        params['response_format'] = response_format
     
-    content = response.choices[0].message.content.strip()
-    # ```markdown で囲まれている場合は除去
-    if content.startswith('```markdown') and content.endswith('```'):
-        content = content[11:-3].strip()
-    elif content.startswith('```') and content.endswith('```'):
-        content = content[3:-3].strip()
-    return content
-
-def generate_article_content(title: str, theme: str, categories: List[str], tags: List[str]) -> str:
-    """SEO最適化された記事本文を生成"""
-    # 関連キーワードを自動生成
-    related_keywords = extract_related_keywords(theme, title)
+    cache_key = None
+    if llm_cache:
+        cache_key = DiskCache.make_key(params)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return parse(cached) if parse else cached
     
-    prompt = f"""
-「{title}」というタイトルで、{theme}についてのSEO最適化されたブログ記事を書いてください。
+    async with request_semaphore:
+        response = await client.chat.completions.create(**params, extra_body={'prompt_cache_key': PROMPT_CACHE_KEY})
+    choice = response.choices[0]
+    content = choice.message.content.strip()
+    
+    # 変換に失敗した応答は例外がそのまま伝わり、キャッシュには残らない
+    result = parse(content) if parse else content
+    
+    # 最後まで生成されなかった応答は再実行時に使えないので保存しない
+    if llm_cache and choice.finish_reason == 'stop':
+        llm_cache.set(cache_key, content)
+    
+    return result
+
+# 記事（タイトルと本文）を生成するときの共通の指示
+# システムプロンプトと要件は毎回同じ内容を先頭に置き、OpenAIのプロンプトキャッシュで再利用されるようにする
+ARTICLE_SYSTEM_PROMPT = "あなたはSEOとコンバージョン最適化に精通した、ビジネス経験が豊富なライターです。難しいことをわかりやすく説明し、読者がすぐに実践できるアドバイスを伝えるのが得意です。"
+ARTICLE_REQUIREMENTS = """SEOに最適化されたビジネスブログの記事を、次の要件に沿って書いてください。
 
 ターゲット読者：起業家、経営者、フリーランス
-彼らが実際に使える具体的なアドバイスや方法を教えてあげてください。
+彼らが「これは読みたい！」と思い、実際に使える具体的なアドバイスや方法を教えてあげてください。
 
-記事の長さ：2000〜2500文字（SEOと読者満足度の両立に理想的な長さ）
+タイトルのSEO要件：
+- 20-35文字（理想は28文字前後）
+- 主要キーワード（記事のテーマ）を含める
+- 数字や具体的なメリットを含める（例：5つの方法、3ステップ、2倍の成果）
+- 「〜の方法」「〜のコツ」「完全ガイド」「成功法則」など実践的な表現を使う
+- 検索者の意図に合致する言葉を使う
+
+本文の長さ：2000〜2500文字（SEOと読者満足度の両立に理想的な長さ）
 
-SEO要件：
-1. 主要キーワード「{theme}」を自然に3-5回含める
-2. 関連キーワード {related_keywords} を適切に配置
+本文のSEO要件：
+1. 主要キーワード（記事のテーマ）を自然に3-5回含める
+2. 関連キーワードを適切に配置
 3. 見出し（H2、H3）にキーワードを含める
 4. 最初の100文字以内に主要キーワードを含める
 
-構成：
+本文の構成：
 1. 読者の課題や悩みに共感する導入文（150文字程度）
 2. 本文は3〜4つのセクションに分けて
 3. 各セクションに具体例・データ・ケーススタディを含める
@@ -119,27 +160,102 @@ SEO要件：
 - 「です・ます調」
 - 専門用語は分かりやすく説明
 
-Markdownで書いてください。見出しは##（H2）から始めてください。
-タイトルは既に決まっているので、本文には入れないでください。
+本文はMarkdownで書き、見出しは##（H2）から始めてください。本文にはタイトルを入れないでください。"""
+
+def strip_code_fence(content: str) -> str:
+    """```markdown などで囲まれている場合は除去"""
+    content = content.strip()
+    if content.startswith('```markdown') and content.endswith('```'):
+        content = content[11:-3].strip()
+    elif content.startswith('```') and content.endswith('```'):
+        content = content[3:-3].strip()
+    return content
+
+def article_fields(article: Dict) -> Dict:
+    """JSON応答の記事から、コードブロックの囲みを除いたタイトルと本文を取り出す"""
+    return {
+        'title': strip_code_fence(article['title']),
+        'content': strip_code_fence(article['content'])
+    }
+
+def parse_article(content: str) -> Dict:
+    """記事1件分のJSON応答を {"title": ..., "content": ...} に変換"""
+    return article_fields(json.loads(content))
+
+def parse_articles(content: str) -> Dict[int, Dict]:
+    """まとめて生成した記事のJSON応答を、topic_index をキーにした辞書に変換"""
+    return {int(article['topic_index']): article_fields(article) for article in json.loads(content)['articles']}
+
+async def generate_articles_batch(topics: List[Dict]) -> List[Dict]:
+    """
+    複数トピックの記事（タイトルと本文）を1回のAPI呼び出しでまとめて生成
+    
+    Args:
+        topics: TOPICSから選んだトピックのリスト
+    
+    Returns:
+        topicsと同じ順番の {"title": ..., "content": ...} のリスト（生成できなかった記事はNone）
+    """
+    topic_lines = "\n".join(
+        f"- topic_index {i}: テーマ「{topic['theme']}」／関連キーワード {extract_related_keywords(topic['theme'], '')}"
+        for i, topic in enumerate(topics)
+    )
+    
+    prompt = f"""
+以下の{len(topics)}個のテーマについて、それぞれ記事を書いてください。
+
+{topic_lines}
+
+次の形式のJSONで出力してください：
+{{"articles": [{{"topic_index": 0, "title": "タイトル", "content": "本文"}}]}}
+    """
+    
+    # 出力が途中で切れた場合などJSONとして読めないときは、呼び出し側で1記事ずつ生成する
+    try:
+        articles = await chat(
+            messages=[
+                {"role": "system", "content": ARTICLE_SYSTEM_PROMPT},
+                {"role": "user", "content": ARTICLE_REQUIREMENTS},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=min(ARTICLE_TOKEN_BUDGET * len(topics), MAX_OUTPUT_TOKENS),
+            response_format={"type": "json_object"},
+            parse=parse_articles
+        )
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        print(f"まとめて生成した記事を読み取れませんでした（1記事ずつ生成します）: {e}")
+        articles = {}
+    
+    return [
+        article if article and article['title'] and article['content'] else None
+        for article in map(articles.get, range(len(topics)))
+    ]
+
+async def generate_title_and_content(theme: str, categories: List[str], tags: List[str]) -> Dict:
+    """SEO最適化された記事のタイトルと本文を1回のAPI呼び出しで生成"""
+    # 関連キーワードを自動生成
+    related_keywords = extract_related_keywords(theme, '')
+    
+    prompt = f"""
+{theme}について記事を書いてください。
+関連キーワード：{related_keywords}
+
+次の形式のJSONで出力してください：
+{{"title": "タイトル", "content": "本文"}}
     """
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    return await chat(
         messages=[
-            {"role": "system", "content": "あなたはビジネス経験が豊富なライターです。難しいことをわかりやすく説明し、読者がすぐに実践できるアドバイスを伝えるのが得意です。"},
+            {"role": "system", "content": ARTICLE_SYSTEM_PROMPT},
+            {"role": "user", "content": ARTICLE_REQUIREMENTS},
             {"role": "user", "content": prompt}
         ],
         temperature=0.7,
-        max_tokens=3000
+        max_tokens=ARTICLE_TOKEN_BUDGET,
+        response_format={"type": "json_object"},
+        parse=parse_article
     )
-    
-    content = response.choices[0].message.content.strip()
-    # ```markdown で囲まれている場合は除去
-    if content.startswith('```markdown') and content.endswith('```'):
-        content = content[11:-3].strip()
-    elif content.startswith('```') and content.endswith('```'):
-        content = content[3:-3].strip()
-    return content
 
 def create_filename(title: str) -> str:
     """ファイル名を生成"""
@@ -148,7 +264,7 @@ def create_filename(title: str) -> str:
     
     # シンプルなファイル名生成（日本語を避ける）
     # タイトルの最初の単語を使うか、ランダムIDを生成
-    words = re.findall(r'[a-zA-Z]+', title)
+    words = ASCII_WORD_PATTERN.findall(title)
     if words:
         # 最初の3単語を使う
         clean_title = '-'.join(words[:3]).lower()
@@ -161,10 +277,10 @@ def create_filename(title: str) -> str:
     
     return f"{date_str}-{clean_title}.md"
 
-def save_article(title: str, content: str, categories: List[str], tags: List[str], image_path: str = None, image_info: Dict = None) -> str:
+async def save_article(title: str, content: str, categories: List[str], tags: List[str], image_path: str = None, image_info: Dict = None) -> str:
     """SEO最適化された記事をMarkdownファイルとして保存"""
     # メタディスクリプションを生成
-    meta_description = generate_meta_description(title, content)
+    meta_description = await generate_meta_description(title, content)
     
     # フロントマター
     frontmatter_dict = {
@@ -205,12 +321,16 @@ def save_article(title: str, content: str, categories: List[str], tags: List[str
     # ディレクトリが存在しない場合は作成
     os.makedirs('_drafts', exist_ok=True)
     
-    # ファイルに保存
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(full_article)
+    # ファイルに保存（書き込みの間も他の記事のリクエストが進むよう、別スレッドで行う）
+    await asyncio.to_thread(write_text_file, filepath, full_article)
     
     return filepath
 
+def write_text_file(path: str, text: str):
+    """テキストファイルを書き出す"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
 def extract_related_keywords(theme: str, title: str) -> str:
     """テーマとタイトルから関連キーワードを抽出"""
     keyword_map = {
@@ -224,7 +344,7 @@ def extract_related_keywords(theme: str, title: str) -> str:
     keywords = keyword_map.get(theme, [])
     return "、".join(keywords[:3])  # 上位3つを返す
 
-def generate_meta_description(title: str, content: str) -> str:
+async def generate_meta_description(title: str, content: str) -> str:
     """SEO用のメタディスクリプションを生成"""
     prompt = f"""
 この記事のメタディスクリプションを作成してください。
@@ -241,8 +361,7 @@ def generate_meta_description(title: str, content: str) -> str:
 メタディスクリプションのみを出力してください。
     """
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    return await chat(
         messages=[
             {"role": "system", "content": "あなたはSEOスペシャリストです。"},
             {"role": "user", "content": prompt}
@@ -250,66 +369,93 @@ def generate_meta_description(title: str, content: str) -> str:
         temperature=0.7,
         max_tokens=100
     )
+
+async def build_article(http: aiohttp.ClientSession, number: int, topic: Dict, article: Optional[Dict],
+                        image_search: Optional[asyncio.Task]) -> str:
+    """1記事分のタイトル・本文・画像を揃えて保存し、保存先のパスを返す（image_searchは先行して始めた画像検索）"""
+    if not article:
+        # まとめて生成できなかった記事は1記事ずつ生成する
+        article = await generate_title_and_content(topic["theme"], topic["categories"], topic["tags"])
+    title = article['title']
+    content = article['content']
+    print(f"記事 {number} のタイトル: {title}")
     
-    return response.choices[0].message.content.strip()
+    # 画像を取得（オプション）
+    image_info = None
+    image_path = None
+    if image_search:
+        image_info = await image_search
+        if image_info:
+            # ファイル名を先に生成
+            filename = create_filename(title)
+            image_path = await download_and_save_image(http, image_info, filename)
+    
+    # ファイルに保存
+    filepath = await save_article(
+        title,
+        content,
+        topic["categories"],
+        topic["tags"],
+        image_path,
+        image_info
+    )
+    
+    print(f"保存完了: {filepath}")
+    return filepath
 
-def main():
+async def main():
     """メイン処理"""
+    global llm_cache, request_semaphore
+    
+    parser = argparse.ArgumentParser(description='AI記事自動生成ツール')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='OpenAIの応答のキャッシュを使わずに毎回生成する')
+    args = parser.parse_args()
+    
     if not os.environ.get('OPENAI_API_KEY'):
         print("エラー: OPENAI_API_KEY環境変数が設定されていません。")
         sys.exit(1)
     
+    if not args.no_cache:
+        llm_cache = DiskCache(OPENAI_CACHE_PATH, ttl=OPENAI_CACHE_TTL)
+    request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
     print("AI記事生成を開始します...")
     
-    # 3記事生成
-    generated_files = []
+    # ランダムにトピックを選択
+    topics = [random.choice(TOPICS) for _ in range(3)]
     
-    for i in range(3):
-        print(f"\n記事 {i+1}/3 を生成中...")
-        
-        # ランダムにトピックを選択
-        topic = random.choice(TOPICS)
+    async with create_http_session() as http:
+        # 画像の検索語はテーマから決まるので、記事の生成を待たずに検索を始めておく
+        image_searches = [None] * len(topics)
+        if UNSPLASH_ACCESS_KEY:
+            print("Unsplash画像を検索中...")
+            image_searches = [
+                asyncio.create_task(fetch_unsplash_image(http, topic["theme"], topic["theme"]))
+                for topic in topics
+            ]
         
+        # タイトルと本文は1回のリクエストでまとめて生成
+        print(f"\n{len(topics)}記事のタイトルと本文をまとめて生成中...")
         try:
-            # タイトル生成
-            title = generate_article_title(topic["theme"])
-            print(f"タイトル: {title}")
-            
-            # 本文生成
-            content = generate_article_content(
-                title, 
-                topic["theme"], 
-                topic["categories"], 
-                topic["tags"]
-            )
-            
-            # 画像を取得（オプション）
-            image_info = None
-            image_path = None
-            if UNSPLASH_ACCESS_KEY:
-                print("Unsplash画像を検索中...")
-                image_info = fetch_unsplash_image(title, topic["theme"])
-                if image_info:
-                    # ファイル名を先に生成
-                    filename = create_filename(title)
-                    image_path = download_and_save_image(image_info, filename)
-            
-            # ファイルに保存
-            filepath = save_article(
-                title,
-                content,
-                topic["categories"],
-                topic["tags"],
-                image_path,
-                image_info
-            )
-            
-            generated_files.append(filepath)
-            print(f"保存完了: {filepath}")
-            
+            articles = await generate_articles_batch(topics)
         except Exception as e:
             print(f"エラーが発生しました: {e}")
-            continue
+            articles = [None] * len(topics)
+        
+        # 画像の保存やメタディスクリプションの生成は記事ごとに独立しているので、並行して進める
+        results = await asyncio.gather(
+            *(build_article(http, i + 1, topic, article, image_search)
+              for i, (topic, article, image_search) in enumerate(zip(topics, articles, image_searches))),
+            return_exceptions=True
+        )
+    
+    generated_files = []
+    for i, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            print(f"記事 {i} でエラーが発生しました: {result}")
+        else:
+            generated_files.append(result)
     
     print("\n記事生成が完了しました。")
     print("生成されたファイル:")
@@ -321,7 +467,48 @@ def main():
         with open(os.environ.get('GITHUB_OUTPUT', 'output.txt'), 'a') as f:
             f.write(f"generated_files={','.join(generated_files)}\n")
 
-def fetch_unsplash_image(query: str, theme: str) -> Dict:
+def create_http_session() -> aiohttp.ClientSession:
+    """Unsplash用のHTTPセッションを作成（接続はセッション内で再利用し、認証ヘッダーも一度だけ設定する）"""
+    headers = {"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"} if UNSPLASH_ACCESS_KEY else None
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE),
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        headers=headers
+    )
+
+async def http_get(http: aiohttp.ClientSession, url: str, params: Optional[Dict] = None, as_json: bool = False,
+                   dest: Optional[str] = None):
+    """
+    GETリクエストを送り、応答の本文を返す（一時的なエラーは指数バックオフで再試行）
+    
+    destを指定した場合は本文をメモリに溜めずにファイルへ書き出し、そのパスを返す（最後まで受信できた場合だけdestに置く）。
+    """
+    for attempt in range(HTTP_RETRY_TOTAL + 1):
+        try:
+            async with http.get(url, params=params) as response:
+                if response.status not in HTTP_RETRY_STATUSES or attempt == HTTP_RETRY_TOTAL:
+                    response.raise_for_status()
+                    if dest:
+                        # 一時ファイルに書き出してから置き換え、途中で失敗しても書きかけの画像を残さない
+                        part_path = dest + '.part'
+                        try:
+                            with open(part_path, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(HTTP_CHUNK_SIZE):
+                                    f.write(chunk)
+                            os.replace(part_path, dest)
+                        except BaseException:
+                            if os.path.exists(part_path):
+                                os.remove(part_path)
+                            raise
+                        return dest
+                    return await response.json() if as_json else await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == HTTP_RETRY_TOTAL:
+                raise
+        
+        await asyncio.sleep(HTTP_RETRY_BACKOFF * (2 ** attempt))
+
+async def fetch_unsplash_image(http: aiohttp.ClientSession, query: str, theme: str) -> Dict:
     """Unsplash APIから画像を取得"""
     if not UNSPLASH_ACCESS_KEY:
         print("Unsplash APIキーが設定されていないため、画像は追加されません。")
@@ -346,13 +533,7 @@ def fetch_unsplash_image(query: str, theme: str) -> Dict:
             "per_page": 5,
             "orientation": "landscape"
         }
-        headers = {
-            "Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"
-        }
-        
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = await http_get(http, url, params=params, as_json=True)
         
         if data.get('results'):
             # ランダムに1つ選択
@@ -369,7 +550,7 @@ def fetch_unsplash_image(query: str, theme: str) -> Dict:
     
     return None
 
-def download_and_save_image(image_info: Dict, filename: str) -> str:
+async def download_and_save_image(http: aiohttp.ClientSession, image_info: Dict, filename: str) -> str:
     """画像をダウンロードして保存"""
     if not image_info:
         return None
@@ -377,14 +558,7 @@ def download_and_save_image(image_info: Dict, filename: str) -> str:
     try:
         # Unsplashのダウンロードトリガー（利用規約に従う）
         if UNSPLASH_ACCESS_KEY and 'download_url' in image_info:
-            requests.get(
-                image_info['download_url'],
-                headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
-            )
-        
-        # 画像をダウンロード
-        response = requests.get(image_info['url'])
-        response.raise_for_status()
+            await http_get(http, image_info['download_url'])
         
         # assetsディレクトリを作成
         assets_dir = os.path.join('assets', 'img', 'posts')
@@ -394,9 +568,8 @@ def download_and_save_image(image_info: Dict, filename: str) -> str:
         image_filename = f"{filename.replace('.md', '')}.jpg"
         image_path = os.path.join(assets_dir, image_filename)
         
-        # 画像を保存
-        with open(image_path, 'wb') as f:
-            f.write(response.content)
+        # 画像をダウンロードし、メモリに溜めずに少しずつファイルへ書き出す
+        await http_get(http, image_info['url'], dest=image_path)
         
         print(f"画像を保存しました: {image_path}")
         return f"/assets/img/posts/{image_filename}"
@@ -419,4 +592,4 @@ def download_and_save_image(image_info: Dict, filename: str) -> str:
 #     pass
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
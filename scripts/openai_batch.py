@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+OpenAI Batch API ユーティリティ
+Chat Completionsのリクエストをまとめて Batch API で実行（料金は通常の約半額）
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Tuple
+
+# Batch API が終了とみなすステータス
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+class BatchDispatcher:
+    def __init__(self, client, poll_interval: float = 30.0, collect_delay: float = 0.5):
+        """
+        Chat Completionsリクエストを溜めて Batch API に一括送信するクラス
+        
+        並行して動いている複数の処理から create() を呼ぶと、collect_delay の間に
+        集まったリクエストが1つのバッチとして送信されます。
+        
+        Args:
+            client: AsyncOpenAI クライアント
+            poll_interval: バッチの完了を確認する間隔（秒）
+            collect_delay: 最初のリクエストからバッチ送信までの待ち時間（秒）
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.collect_delay = collect_delay
+        self._pending: List[Tuple[str, Dict, asyncio.Future]] = []
+        self._flush_task = None
+        self._counter = 0
+    
+    async def create(self, **body) -> str:
+        """リクエストを次のバッチに登録し、応答テキストを返す"""
+        content, _ = await self.create_with_finish_reason(**body)
+        return content
+    
+    async def create_with_finish_reason(self, **body) -> Tuple[str, str]:
+        """リクエストを次のバッチに登録し、(応答テキスト, finish_reason) を返す"""
+        future = asyncio.get_running_loop().create_future()
+        self._counter += 1
+        self._pending.append((f"request-{self._counter}", body, future))
+        
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        
+        return await future
+    
+    async def _flush_later(self):
+        """少し待ってから溜まったリクエストをまとめて送信"""
+        await asyncio.sleep(self.collect_delay)
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+        
+        try:
+            results = await self.run_batch({custom_id: body for custom_id, body, _ in pending})
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for custom_id, _, future in pending:
+            if custom_id in results:
+                future.set_result(results[custom_id])
+            else:
+                future.set_exception(RuntimeError(f"バッチの応答が見つかりません: {custom_id}"))
+    
+    async def run_batch(self, bodies: Dict[str, Dict]) -> Dict[str, Tuple[str, str]]:
+        """
+        リクエストをJSONLにしてバッチを作成し、完了まで待って結果を返す
+        
+        Args:
+            bodies: custom_id をキーにした Chat Completions のリクエストボディ
+        
+        Returns:
+            custom_id をキーにした (応答テキスト, finish_reason) の辞書（失敗したリクエストは含まない）
+        """
+        lines = [
+            json.dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': body
+            }, ensure_ascii=False)
+            for custom_id, body in bodies.items()
+        ]
+        
+        batch_file = await self.client.files.create(
+            file=('batch.jsonl', '\n'.join(lines).encode('utf-8')),
+            purpose='batch'
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        print(f"  📦 バッチを送信しました: {batch.id}（{len(bodies)}件）")
+        
+        while batch.status not in FINAL_STATUSES:
+            await asyncio.sleep(self.poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+        
+        if batch.status != 'completed' or not batch.output_file_id:
+            raise RuntimeError(f"バッチ処理が完了しませんでした: {batch.id} ({batch.status})")
+        
+        output = await self.client.files.content(batch.output_file_id)
+        
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get('response') or {}
+            if response.get('status_code') == 200:
+                choice = response['body']['choices'][0]
+                results[item['custom_id']] = (choice['message']['content'].strip(), choice.get('finish_reason'))
+        
+        return results
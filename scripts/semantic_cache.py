@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+セマンティックキャッシュユーティリティ
+埋め込みベクトルが十分に近い入力に対して、過去に生成した結果を再利用する
+"""
+
+import os
+import json
+import math
+import time
+import sqlite3
+from typing import Any, List, Optional
+
+class SemanticCache:
+    def __init__(self, path: str, threshold: float = 0.95, ttl: Optional[int] = None):
+        """
+        SQLiteを使った類似度検索型のキャッシュ
+        
+        件数は個人ブログの記事数程度を想定し、検索は全件とのコサイン類似度を計算する単純な方式です。
+        
+        Args:
+            path: SQLiteファイルのパス
+            threshold: ヒットとみなすコサイン類似度の下限
+            ttl: 有効期限（秒）。Noneの場合は無期限
+        """
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY, embedding TEXT NOT NULL, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        if ttl is not None:
+            self.conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - ttl,))
+        self.conn.commit()
+    
+    @staticmethod
+    def normalize(vector: List[float]) -> List[float]:
+        """ベクトルを長さ1に正規化（内積がそのままコサイン類似度になる）"""
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+    
+    def lookup(self, vector: List[float]) -> Optional[Any]:
+        """最も類似度の高いエントリを探し、しきい値以上ならその値を返す"""
+        query = self.normalize(vector)
+        best_score, best_value = -1.0, None
+        
+        for embedding, value in self.conn.execute("SELECT embedding, value FROM entries"):
+            score = sum(a * b for a, b in zip(query, json.loads(embedding)))
+            if score > best_score:
+                best_score, best_value = score, value
+        
+        if best_value is None or best_score < self.threshold:
+            return None
+        return json.loads(best_value)
+    
+    def add(self, vector: List[float], value: Any):
+        """ベクトルと値を登録"""
+        self.conn.execute(
+            "INSERT INTO entries (embedding, value, created_at) VALUES (?, ?, ?)",
+            (json.dumps(self.normalize(vector)), json.dumps(value, ensure_ascii=False), time.time())
+        )
+        self.conn.commit()
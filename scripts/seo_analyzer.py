@@ -6,289 +6,485 @@ SEO分析と改善提案ツール
 
 import os
 import re
+import argparse
+import functools
+import hashlib
 import json
 import yaml
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import frontmatter
 
+from disk_cache import DiskCache
+
+# 分析結果のキャッシュ（ファイルの更新日時とサイズが変わっていない記事は解析し直さない）
+SEO_CACHE_PATH = os.path.join('.cache', 'seo_analysis.sqlite3')
+SEO_CACHE_TTL = 30 * 24 * 60 * 60  # 30日間（削除した記事の結果が残り続けないように）
+
+# フロントマターの区切り行（python-frontmatterのYAMLHandlerと同じ規則）
+FRONTMATTER_BOUNDARY_PATTERN = re.compile(rb'^-{3,}\s*$', re.MULTILINE)
+
+# 分析に使う正規表現（記事ごとに毎回解析し直さないよう、モジュール読み込み時に一度だけコンパイルする）
+# 見出し・画像・リンクの記号はASCIIなので、本文はUTF-8のバイト列のまま走査する
+# （本文全体に一度に適用するので、どのパターンも行をまたいで一致しないようにしている）
+# 見出しの「##」の後には全角スペース（U+3000、UTF-8で E3 80 80）も使われるので、空白として扱う
+H2_PATTERN = re.compile(rb'^##(?=[ \t\r\v\f]|\xe3\x80\x80|$)', re.MULTILINE)
+H3_PATTERN = re.compile(rb'^###(?=[ \t\r\v\f]|\xe3\x80\x80|$)', re.MULTILINE)
+IMAGE_PATTERN = re.compile(rb'!\[(.*?)\]\((.*?)\)')
+INTERNAL_LINK_PATTERN = re.compile(rb'\[([^\]\n]+)\]\((/[^)\n]+)\)')
+DIGIT_PATTERN = re.compile(r'\d+')
+
+# UTF-8の継続バイト（これを除いたバイト数が文字数になる）
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# タイトルに含めたいパワーワード（1回の走査ですべての語を探せるよう、選択の正規表現にしておく）
+POWER_WORDS = ['方法', 'コツ', '完全ガイド', '成功', '戦略', '実践', '解説']
+POWER_WORD_PATTERN = re.compile('|'.join(map(re.escape, POWER_WORDS)))
+
+# 問題点の種類（改善提案は問題点の文言ではなく、この種類から引く）
+ISSUE_TITLE_MISSING = 'title_missing'
+ISSUE_TITLE_SHORT = 'title_short'
+ISSUE_TITLE_LONG = 'title_long'
+ISSUE_NO_POWER_WORD = 'no_power_word'
+ISSUE_NO_NUMBER = 'no_number'
+ISSUE_META_DESC = 'meta_desc'
+ISSUE_CONTENT_SHORT = 'content_short'
+ISSUE_CONTENT_LONG = 'content_long'
+ISSUE_FEW_H2 = 'few_h2'
+ISSUE_NO_H3 = 'no_h3'
+ISSUE_KEYWORD_DENSITY = 'keyword_density'
+ISSUE_IMAGE = 'image'
+ISSUE_INTERNAL_LINKS = 'internal_links'
+
+# 問題点の種類ごとの改善提案
+SUGGESTIONS = {
+    ISSUE_TITLE_SHORT: "タイトルに具体的な数字や期待される結果を追加してください",
+    ISSUE_NO_POWER_WORD: "「〜の方法」「成功する〜」「完全ガイド」などの訴求力のある言葉を追加してください",
+    ISSUE_META_DESC: "記事の要約と読者が得られるメリットを120-155文字で記載してください",
+    ISSUE_INTERNAL_LINKS: "関連する他の記事へのリンクを3-5個追加してください",
+    ISSUE_FEW_H2: "コンテンツを論理的なセクションに分け、各セクションにH2見出しを追加してください",
+    ISSUE_IMAGE: "視覚的な説明やインフォグラフィックを追加して、読みやすさを向上させてください",
+}
+
+# YAMLの読み込みにはlibyamlのCバインディングを使う（libyamlなしでビルドされたPyYAMLでは純Python版）
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+KEYWORDS_FILE = '_data/keywords.yml'
+
+# 分析し直す記事がこの件数以上あればプロセスプールで並列に分析する（少ない場合は起動コストの方が大きい）
+PROCESS_POOL_MIN_POSTS = 8
+
+@functools.lru_cache(maxsize=1)
+def load_keywords() -> Dict:
+    """キーワードデータを読み込み（プロセスごとに1回だけ解析する）"""
+    if os.path.exists(KEYWORDS_FILE):
+        with open(KEYWORDS_FILE, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=YAML_LOADER) or {}
+    return {}
+
+def parse_post(data: bytes) -> Tuple[Dict, bytes]:
+    """
+    記事ファイルの内容をフロントマターと本文に分ける
+    
+    改行はテキストモードで読んだときと同じくLFにそろえる（CRLFの記事も本文の文字数が変わらない）。
+    区切り行はpython-frontmatterと同じ規則（3つ以上の「-」と後続の空白だけの行）で探し、バイト列のまま分割する。
+    区切りで始まらない記事や、フロントマターが辞書として読めない記事はpython-frontmatterで解析する。
+    
+    Returns:
+        (フロントマターの辞書, 本文のUTF-8バイト列)
+    """
+    data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    
+    if data.startswith(b'---'):
+        boundaries = FRONTMATTER_BOUNDARY_PATTERN.finditer(data)
+        opening = next(boundaries, None)
+        closing = next(boundaries, None)
+        if opening and opening.start() == 0 and closing:
+            try:
+                metadata = yaml.load(data[opening.end():closing.start()], Loader=YAML_LOADER)
+            except yaml.YAMLError:
+                metadata = False
+            if metadata is None or isinstance(metadata, dict):
+                return metadata or {}, data[closing.end():].strip()
+    
+    post = frontmatter.loads(data.decode('utf-8'))
+    return post.metadata, post.content.encode('utf-8')
+
+def scan_content(content: bytes) -> Dict:
+    """
+    本文（UTF-8のバイト列）を1回だけ走査し、見出し・画像・内部リンクをまとめて数える
+    
+    行ごとのループはPythonで回さず、各パターンを本文全体に一度ずつ適用する（走査はすべてreのC実装の中で行われる）。
+    画像・リンクの正規表現は、一致しうる並び（「![」「](/」）が本文にあるときだけ実行する。
+    本文は文字列にデコードせず、文字数も継続バイトを除いたバイト数として数える。
+    
+    Returns:
+        {'h2': H2見出しの数, 'h3': H3見出しの数, 'images': [(alt, url)], 'internal_links': [(text, path)],
+         'length': 本文の文字数,
+         'content_lower': 英字を小文字にした本文（キーワードの出現回数を数えるときに使い回す）}
+    """
+    h2_count = len(H2_PATTERN.findall(content))
+    h3_count = len(H3_PATTERN.findall(content))
+    images = IMAGE_PATTERN.findall(content) if b'![' in content else []
+    internal_links = INTERNAL_LINK_PATTERN.findall(content) if b'](/' in content else []
+    
+    return {'h2': h2_count, 'h3': h3_count, 'images': images, 'internal_links': internal_links,
+            'length': len(content.translate(None, UTF8_CONTINUATION_BYTES)),
+            'content_lower': content.lower()}
+
 class SEOAnalyzer:
-    def __init__(self):
-        self.seo_keywords = self.load_keywords()
+    def __init__(self, use_cache: bool = True):
+        # 分析ルールを変更した場合は --no-cache で実行し直す
+        self.cache = DiskCache(SEO_CACHE_PATH, ttl=SEO_CACHE_TTL) if use_cache else None
+        self.seo_keywords = load_keywords()
         self.min_word_count = 1000
         self.max_word_count = 3000
         self.ideal_title_length = (25, 35)
         self.ideal_meta_desc_length = (120, 155)
     
-    def load_keywords(self) -> Dict:
-        """キーワードデータを読み込み"""
-        keywords_file = '_data/keywords.yml'
-        if os.path.exists(keywords_file):
-            with open(keywords_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
-        return {}
-    
     def analyze_post(self, filepath: str) -> Dict:
-        """記事のSEO分析を実行"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-        
-        content = post.content
-        metadata = post.metadata
+        """記事のSEO分析を実行（前回から変更されていない記事はキャッシュした結果を返す）"""
+        return self.analyze_posts([filepath])[0]
+    
+    def analyze_posts(self, filepaths: List[str]) -> List[Dict]:
+        """
+        複数の記事のSEO分析を実行（キャッシュにない記事はプロセスプールで並列に分析する）
+        
+        前回から変更されていない記事はファイルを読まずにキャッシュした結果を使い、
+        変更された記事も内容が同じもの（別のパスにある同じ記事や、前回の実行で分析した内容）は分析し直さない。
+        キャッシュの読み書きはこのプロセスだけで行い、ワーカーには分析する記事の内容だけを渡す。
+        
+        Returns:
+            filepathsと同じ順の分析結果
+        """
+        analyses: List[Optional[Dict]] = [None] * len(filepaths)
+        misses = []
+        
+        for i, filepath in enumerate(filepaths):
+            if self.cache:
+                stat = os.stat(filepath)
+                cached = self.cache.get(DiskCache.make_key('seo-analysis', filepath))
+                if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                    analyses[i] = cached['analysis']
+                    continue
+                misses.append((i, filepath, stat))
+            else:
+                misses.append((i, filepath, None))
+        
+        # 変更された記事は内容のハッシュでまとめ、同じ内容は1回だけ分析する
+        by_digest: Dict[str, Optional[Dict]] = {}
+        pending: Dict[str, bytes] = {}
+        digests = []
+        for _, filepath, _ in misses:
+            with open(filepath, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            digests.append(digest)
+            if digest in by_digest:
+                continue
+            by_digest[digest] = self.cache.get(DiskCache.make_key('seo-analysis-content', digest)) if self.cache else None
+            if by_digest[digest] is None:
+                pending[digest] = data
+        
+        if len(pending) < PROCESS_POOL_MIN_POSTS:
+            results = [self._analyze_data(data) for data in pending.values()]
+        else:
+            with ProcessPoolExecutor(initializer=_init_worker) as executor:
+                results = list(executor.map(_analyze_in_worker, pending.values(), chunksize=16))
+        
+        for digest, analysis in zip(pending, results):
+            by_digest[digest] = analysis
+            if self.cache:
+                self.cache.set(DiskCache.make_key('seo-analysis-content', digest), analysis)
+        
+        for (i, filepath, stat), digest in zip(misses, digests):
+            analysis = {'file': filepath, **by_digest[digest]}
+            analyses[i] = analysis
+            if self.cache:
+                self.cache.set(DiskCache.make_key('seo-analysis', filepath),
+                               {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'analysis': analysis})
+        
+        return analyses
+    
+    def _analyze_data(self, data: bytes) -> Dict:
+        """記事ファイルの内容のSEO分析を実行（結果には記事のパスを含めない）"""
+        metadata, content = parse_post(data)
         
         analysis = {
-            'file': filepath,
             'title': metadata.get('title', ''),
             'score': 0,
             'issues': [],
             'suggestions': []
         }
+        issues = []
         
         # タイトル分析
         title_score, title_issues = self.analyze_title(metadata.get('title', ''))
         analysis['score'] += title_score
-        analysis['issues'].extend(title_issues)
+        issues.extend(title_issues)
         
         # メタディスクリプション分析
         meta_score, meta_issues = self.analyze_meta_description(metadata.get('description', ''))
         analysis['score'] += meta_score
-        analysis['issues'].extend(meta_issues)
+        issues.extend(meta_issues)
+        
+        # 見出し・画像・内部リンクは本文を1回走査してまとめて数える
+        scan = scan_content(content)
         
         # コンテンツ分析
-        content_score, content_issues = self.analyze_content(content, metadata)
+        content_score, content_issues = self.analyze_content(content, metadata, scan)
         analysis['score'] += content_score
-        analysis['issues'].extend(content_issues)
+        issues.extend(content_issues)
         
         # 画像分析
-        image_score, image_issues = self.analyze_images(content, metadata)
+        image_score, image_issues = self.analyze_images(content, metadata, scan)
         analysis['score'] += image_score
-        analysis['issues'].extend(image_issues)
+        issues.extend(image_issues)
         
         # 内部リンク分析
-        link_score, link_issues = self.analyze_internal_links(content)
+        link_score, link_issues = self.analyze_internal_links(content, scan)
         analysis['score'] += link_score
-        analysis['issues'].extend(link_issues)
+        issues.extend(link_issues)
         
         # 改善提案を生成
-        analysis['suggestions'] = self.generate_suggestions(analysis['issues'])
+        # レポートには文言だけを残し、改善提案は問題点の種類から引く
+        analysis['issues'] = [message for _, message in issues]
+        analysis['suggestions'] = self.generate_suggestions(issues)
         
         # スコアを100点満点に正規化
         analysis['score'] = min(100, max(0, analysis['score']))
         
         return analysis
     
-    def analyze_title(self, title: str) -> Tuple[int, List[str]]:
+    def analyze_title(self, title: str) -> Tuple[int, List[Tuple[str, str]]]:
         """タイトルのSEO分析"""
         score = 20  # 基本スコア
         issues = []
         
         if not title:
-            return 0, ["タイトルが設定されていません"]
+            return 0, [(ISSUE_TITLE_MISSING, "タイトルが設定されていません")]
         
         title_length = len(title)
         
         # 長さチェック
         if title_length < self.ideal_title_length[0]:
             score -= 5
-            issues.append(f"タイトルが短すぎます（{title_length}文字）。{self.ideal_title_length[0]}文字以上が推奨です")
+            issues.append((ISSUE_TITLE_SHORT, f"タイトルが短すぎます（{title_length}文字）。{self.ideal_title_length[0]}文字以上が推奨です"))
         elif title_length > self.ideal_title_length[1]:
             score -= 5
-            issues.append(f"タイトルが長すぎます（{title_length}文字）。{self.ideal_title_length[1]}文字以下が推奨です")
+            issues.append((ISSUE_TITLE_LONG, f"タイトルが長すぎます（{title_length}文字）。{self.ideal_title_length[1]}文字以下が推奨です"))
         
         # パワーワードチェック
-        power_words = ['方法', 'コツ', '完全ガイド', '成功', '戦略', '実践', '解説']
-        if any(word in title for word in power_words):
+        if POWER_WORD_PATTERN.search(title):
             score += 5
         else:
-            issues.append("タイトルにパワーワード（方法、コツ、完全ガイドなど）が含まれていません")
+            issues.append((ISSUE_NO_POWER_WORD, "タイトルにパワーワード（方法、コツ、完全ガイドなど）が含まれていません"))
         
         # 数字チェック
-        if re.search(r'\d+', title):
+        if DIGIT_PATTERN.search(title):
             score += 5
         else:
-            issues.append("タイトルに数字が含まれていません（例：5つの方法、10のコツ）")
+            issues.append((ISSUE_NO_NUMBER, "タイトルに数字が含まれていません（例：5つの方法、10のコツ）"))
         
         return score, issues
     
-    def analyze_meta_description(self, description: str) -> Tuple[int, List[str]]:
+    def analyze_meta_description(self, description: str) -> Tuple[int, List[Tuple[str, str]]]:
         """メタディスクリプションの分析"""
         score = 15
         issues = []
         
         if not description:
-            return 0, ["メタディスクリプションが設定されていません"]
+            return 0, [(ISSUE_META_DESC, "メタディスクリプションが設定されていません")]
         
         desc_length = len(description)
         
         if desc_length < self.ideal_meta_desc_length[0]:
             score -= 5
-            issues.append(f"メタディスクリプションが短すぎます（{desc_length}文字）")
+            issues.append((ISSUE_META_DESC, f"メタディスクリプションが短すぎます（{desc_length}文字）"))
         elif desc_length > self.ideal_meta_desc_length[1]:
             score -= 5
-            issues.append(f"メタディスクリプションが長すぎます（{desc_length}文字）")
+            issues.append((ISSUE_META_DESC, f"メタディスクリプションが長すぎます（{desc_length}文字）"))
         
         return score, issues
     
-    def analyze_content(self, content: str, metadata: Dict) -> Tuple[int, List[str]]:
-        """コンテンツのSEO分析"""
+    def analyze_content(self, content: bytes, metadata: Dict, scan: Optional[Dict] = None) -> Tuple[int, List[Tuple[str, str]]]:
+        """コンテンツのSEO分析（scanはscan_contentの結果。省略時はここで走査する）"""
+        scan = scan or scan_content(content)
         score = 30
         issues = []
         
-        # 文字数カウント
-        word_count = len(content)
+        # 文字数カウント（キーワード密度の計算にも使う）
+        word_count = scan['length']
         if word_count < self.min_word_count:
             score -= 10
-            issues.append(f"コンテンツが短すぎます（{word_count}文字）。{self.min_word_count}文字以上が推奨です")
+            issues.append((ISSUE_CONTENT_SHORT, f"コンテンツが短すぎます（{word_count}文字）。{self.min_word_count}文字以上が推奨です"))
         elif word_count > self.max_word_count:
             score -= 5
-            issues.append(f"コンテンツが長すぎます（{word_count}文字）。{self.max_word_count}文字以下が推奨です")
+            issues.append((ISSUE_CONTENT_LONG, f"コンテンツが長すぎます（{word_count}文字）。{self.max_word_count}文字以下が推奨です"))
         
         # 見出し構造チェック
-        h2_count = len(re.findall(r'^##\s', content, re.MULTILINE))
-        h3_count = len(re.findall(r'^###\s', content, re.MULTILINE))
+        h2_count = scan['h2']
+        h3_count = scan['h3']
         
         if h2_count < 3:
             score -= 5
-            issues.append(f"H2見出しが少なすぎます（{h2_count}個）。3個以上が推奨です")
+            issues.append((ISSUE_FEW_H2, f"H2見出しが少なすぎます（{h2_count}個）。3個以上が推奨です"))
         
         if h2_count > 0 and h3_count == 0:
             score -= 3
-            issues.append("H3見出しが使用されていません。階層構造を作ることが推奨されます")
+            issues.append((ISSUE_NO_H3, "H3見出しが使用されていません。階層構造を作ることが推奨されます"))
         
         # キーワード密度チェック
         if metadata.get('categories'):
             main_keyword = metadata['categories'][0]
-            keyword_count = content.lower().count(main_keyword.lower())
-            content_length = len(content)
-            keyword_density = (keyword_count * len(main_keyword)) / content_length * 100
+            main_keyword_lower = main_keyword.lower()
+            keyword_length = len(main_keyword_lower)
+            keyword_count = scan['content_lower'].count(main_keyword_lower.encode('utf-8'))
+            keyword_density = (keyword_count * keyword_length) / word_count * 100
             
             if keyword_density < 0.5:
                 score -= 5
-                issues.append(f"主要キーワード「{main_keyword}」の出現頻度が低すぎます")
+                issues.append((ISSUE_KEYWORD_DENSITY, f"主要キーワード「{main_keyword}」の出現頻度が低すぎます"))
             elif keyword_density > 3:
                 score -= 5
-                issues.append(f"主要キーワード「{main_keyword}」の出現頻度が高すぎます（キーワードスタッフィング）")
+                issues.append((ISSUE_KEYWORD_DENSITY, f"主要キーワード「{main_keyword}」の出現頻度が高すぎます（キーワードスタッフィング）"))
         
         return score, issues
     
-    def analyze_images(self, content: str, metadata: Dict) -> Tuple[int, List[str]]:
-        """画像のSEO分析"""
+    def analyze_images(self, content: bytes, metadata: Dict, scan: Optional[Dict] = None) -> Tuple[int, List[Tuple[str, str]]]:
+        """画像のSEO分析（scanはscan_contentの結果。省略時はここで走査する）"""
+        scan = scan or scan_content(content)
         score = 15
         issues = []
         
         # アイキャッチ画像チェック
         if not metadata.get('image'):
             score -= 10
-            issues.append("アイキャッチ画像が設定されていません")
+            issues.append((ISSUE_IMAGE, "アイキャッチ画像が設定されていません"))
         elif not metadata.get('image_alt'):
             score -= 5
-            issues.append("アイキャッチ画像のalt属性が設定されていません")
+            issues.append((ISSUE_IMAGE, "アイキャッチ画像のalt属性が設定されていません"))
         
         # 本文内の画像チェック
-        images = re.findall(r'!\[(.*?)\]\((.*?)\)', content)
+        images = scan['images']
         if len(images) == 0:
             score -= 5
-            issues.append("本文内に画像が含まれていません")
+            issues.append((ISSUE_IMAGE, "本文内に画像が含まれていません"))
         else:
             for alt_text, _ in images:
                 if not alt_text:
-                    issues.append("alt属性が空の画像があります")
+                    issues.append((ISSUE_IMAGE, "alt属性が空の画像があります"))
                     break
         
         return score, issues
     
-    def analyze_internal_links(self, content: str) -> Tuple[int, List[str]]:
-        """内部リンクの分析"""
+    def analyze_internal_links(self, content: bytes, scan: Optional[Dict] = None) -> Tuple[int, List[Tuple[str, str]]]:
+        """内部リンクの分析（scanはscan_contentの結果。省略時はここで走査する）"""
+        scan = scan or scan_content(content)
         score = 20
         issues = []
         
         # 内部リンクの検出
-        internal_links = re.findall(r'\[([^\]]+)\]\((/[^)]+)\)', content)
+        internal_links = scan['internal_links']
         
         if len(internal_links) == 0:
             score -= 10
-            issues.append("内部リンクが含まれていません")
+            issues.append((ISSUE_INTERNAL_LINKS, "内部リンクが含まれていません"))
         elif len(internal_links) < 3:
             score -= 5
-            issues.append(f"内部リンクが少なすぎます（{len(internal_links)}個）。3個以上が推奨です")
+            issues.append((ISSUE_INTERNAL_LINKS, f"内部リンクが少なすぎます（{len(internal_links)}個）。3個以上が推奨です"))
         
         return score, issues
     
-    def generate_suggestions(self, issues: List[str]) -> List[str]:
-        """改善提案を生成"""
-        suggestions = []
-        
-        for issue in issues:
-            if "タイトルが短すぎます" in issue:
-                suggestions.append("タイトルに具体的な数字や期待される結果を追加してください")
-            elif "パワーワード" in issue:
-                suggestions.append("「〜の方法」「成功する〜」「完全ガイド」などの訴求力のある言葉を追加してください")
-            elif "メタディスクリプション" in issue:
-                suggestions.append("記事の要約と読者が得られるメリットを120-155文字で記載してください")
-            elif "内部リンク" in issue:
-                suggestions.append("関連する他の記事へのリンクを3-5個追加してください")
-            elif "H2見出し" in issue:
-                suggestions.append("コンテンツを論理的なセクションに分け、各セクションにH2見出しを追加してください")
-            elif "画像" in issue:
-                suggestions.append("視覚的な説明やインフォグラフィックを追加して、読みやすさを向上させてください")
-        
-        return suggestions
+    def generate_suggestions(self, issues: List[Tuple[str, str]]) -> List[str]:
+        """改善提案を生成（issuesは (問題点の種類, 文言) のリスト。同じ提案は最初の1回だけ残す）"""
+        return list(dict.fromkeys(SUGGESTIONS[code] for code, _ in issues if code in SUGGESTIONS))
     
     def generate_report(self, analyses: List[Dict]) -> str:
-        """SEO分析レポートを生成"""
-        report = "# SEO分析レポート\n\n"
-        report += f"分析日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        """SEO分析レポートを生成（行をリストに溜めて最後に1回だけ連結する）"""
+        parts = []
+        append = parts.append
+        
+        append("# SEO分析レポート\n\n")
+        append(f"分析日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
         
         # サマリー
         total_score = sum(a['score'] for a in analyses)
         avg_score = total_score / len(analyses) if analyses else 0
         
-        report += f"## サマリー\n"
-        report += f"- 分析記事数: {len(analyses)}\n"
-        report += f"- 平均SEOスコア: {avg_score:.1f}/100\n\n"
+        append(f"## サマリー\n"
+               f"- 分析記事数: {len(analyses)}\n"
+               f"- 平均SEOスコア: {avg_score:.1f}/100\n\n")
         
         # 各記事の詳細
-        report += "## 記事別分析結果\n\n"
+        append("## 記事別分析結果\n\n")
+        
+        # 問題点のない記事は最後に1行ずつまとめ、詳細を出すのは問題点のある記事だけにする
+        problematic = [a for a in analyses if a['issues']]
+        clean = [a for a in analyses if not a['issues']]
         
-        for analysis in sorted(analyses, key=lambda x: x['score']):
-            report += f"### {analysis['title']}\n"
-            report += f"- ファイル: {analysis['file']}\n"
-            report += f"- SEOスコア: {analysis['score']}/100\n"
+        for analysis in sorted(problematic, key=lambda x: x['score']):
+            append(f"### {analysis['title']}\n"
+                   f"- ファイル: {analysis['file']}\n"
+                   f"- SEOスコア: {analysis['score']}/100\n")
             
             if analysis['issues']:
-                report += f"- 問題点:\n"
-                for issue in analysis['issues']:
-                    report += f"  - {issue}\n"
+                append("- 問題点:\n")
+                append(''.join(f"  - {issue}\n" for issue in analysis['issues']))
             
             if analysis['suggestions']:
-                report += f"- 改善提案:\n"
-                for suggestion in analysis['suggestions']:
-                    report += f"  - {suggestion}\n"
+                append("- 改善提案:\n")
+                append(''.join(f"  - {suggestion}\n" for suggestion in analysis['suggestions']))
             
-            report += "\n"
+            append("\n")
         
-        return report
+        if clean:
+            append("### 問題点のない記事\n")
+            append(''.join(f"- {a['title']}（{a['file']}）: {a['score']}/100\n" for a in clean))
+            append("\n")
+        
+        return ''.join(parts)
+
+# ワーカープロセスごとに1つだけ作るアナライザ（キーワードの読み込みをタスクごとに繰り返さない）
+_worker_analyzer: Optional[SEOAnalyzer] = None
+
+def _init_worker():
+    """ワーカープロセスの初期化（キャッシュはメインプロセスだけが扱う）"""
+    global _worker_analyzer
+    _worker_analyzer = SEOAnalyzer(use_cache=False)
+
+def _analyze_in_worker(data: bytes) -> Dict:
+    """ワーカープロセスで1記事の内容を分析"""
+    return _worker_analyzer._analyze_data(data)
+
+def _iter_markdown_files(directory: str) -> Iterator[str]:
+    """ディレクトリ以下のMarkdownファイルのパスを順に返す（scandirの結果を使い、エントリごとにstatしない）"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_markdown_files(entry.path)
+            elif entry.name.endswith('.md'):
+                yield entry.path
+
+def collect_markdown_files(directory: str) -> List[str]:
+    """ディレクトリ以下のMarkdownファイルのパスを集める（ディレクトリがなければ空のリスト）"""
+    if not os.path.isdir(directory):
+        return []
+    return list(_iter_markdown_files(directory))
 
 def main():
     """メイン処理"""
-    analyzer = SEOAnalyzer()
-    analyses = []
+    parser = argparse.ArgumentParser(description='SEO分析と改善提案ツール')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='前回の分析結果を使わずに、すべての記事を分析し直す')
+    args = parser.parse_args()
     
-    # すべての記事を分析
-    for root, dirs, files in os.walk('_posts'):
-        for file in files:
-            if file.endswith('.md'):
-                filepath = os.path.join(root, file)
-                analysis = analyzer.analyze_post(filepath)
-                analyses.append(analysis)
+    analyzer = SEOAnalyzer(use_cache=not args.no_cache)
     
-    # ドラフトも分析
-    for root, dirs, files in os.walk('_drafts'):
-        for file in files:
-            if file.endswith('.md'):
-                filepath = os.path.join(root, file)
-                analysis = analyzer.analyze_post(filepath)
-                analyses.append(analysis)
+    # すべての記事とドラフトをまとめて分析
+    filepaths = collect_markdown_files('_posts') + collect_markdown_files('_drafts')
+    analyses = analyzer.analyze_posts(filepaths)
     
     # レポート生成
     report = analyzer.generate_report(analyses)